@@ -42,6 +42,13 @@ from backend.database.db import SQLALCHEMY_DATABASE_URL
 config.set_main_option('sqlalchemy.url', SQLALCHEMY_DATABASE_URL)
 
 
+def include_name(name, type_, parent_names):
+    # 表结构标记表由启动时同步维护，不参与自动生成
+    if type_ == 'table':
+        return name != 'sys_schema_marker'
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -58,6 +65,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,  # type: ignore
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={'paramstyle': 'named'},
     )
@@ -67,7 +75,7 @@ def run_migrations_offline():
 
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)  # type: ignore
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)  # type: ignore
 
     with context.begin_transaction():
         context.run_migrations()
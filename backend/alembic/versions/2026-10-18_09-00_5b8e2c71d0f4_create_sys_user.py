@@ -0,0 +1,47 @@
+"""create sys_user
+
+Revision ID: 5b8e2c71d0f4
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2c71d0f4'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 表可能已由 create_all 创建
+    if sa.inspect(op.get_bind()).has_table('sys_user'):
+        return
+    op.create_table(
+        'sys_user',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False, comment='主键id'),
+        sa.Column('uuid', sa.String(50), nullable=False),
+        sa.Column('username', sa.String(20), nullable=False, comment='用户名'),
+        sa.Column('password', sa.String(255), nullable=False, comment='密码'),
+        sa.Column('salt', sa.VARBINARY(255), nullable=True, comment='加密盐'),
+        sa.Column('email', sa.String(50), nullable=False, comment='邮箱'),
+        sa.Column('status', sa.Integer(), nullable=False, comment='用户账号状态(0停用 1正常)'),
+        sa.Column('is_superuser', sa.Boolean(), nullable=False, comment='超级权限(0否 1是)'),
+        sa.Column('avatar', sa.String(255), nullable=True, comment='头像'),
+        sa.Column('phone', sa.String(11), nullable=True, comment='手机号'),
+        sa.Column('join_time', sa.DateTime(), nullable=False, comment='注册时间'),
+        sa.Column('last_login_time', sa.DateTime(), nullable=True, comment='上次登录'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid'),
+    )
+    op.create_index('ix_sys_user_id', 'sys_user', ['id'])
+    op.create_index('ix_sys_user_username', 'sys_user', ['username'], unique=True)
+    op.create_index('ix_sys_user_email', 'sys_user', ['email'], unique=True)
+
+
+def downgrade():
+    op.drop_table('sys_user')
@@ -0,0 +1,69 @@
+"""user search indexes
+
+Revision ID: a3f1c9d2e4b7
+Revises: 5b8e2c71d0f4
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d2e4b7'
+down_revision = '5b8e2c71d0f4'
+branch_labels = None
+depends_on = None
+
+# 表可能已由 create_all 创建，仅补充缺少的列和索引
+INDEXES = {
+    'ix_sys_user_join_time_id': ['join_time', 'id'],
+    'ix_sys_user_phone': ['phone'],
+    'ix_sys_user_phone_reverse': ['phone_reverse'],
+}
+FULLTEXT_INDEXES = {
+    'ft_sys_user_username': 'username',
+    'ft_sys_user_phone': 'phone',
+}
+
+
+def _existing_indexes() -> set[str]:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('sys_user')}
+
+
+def upgrade():
+    bind = op.get_bind()
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('sys_user')}
+    if 'phone_reverse' not in columns:
+        op.add_column(
+            'sys_user', sa.Column('phone_reverse', sa.String(11), nullable=True, comment='倒序手机号，用于后缀搜索')
+        )
+        if bind.dialect.name == 'mysql':
+            op.execute('UPDATE sys_user SET phone_reverse = REVERSE(phone) WHERE phone IS NOT NULL')
+        else:
+            rows = bind.execute(sa.text('SELECT id, phone FROM sys_user WHERE phone IS NOT NULL')).all()
+            if rows:
+                bind.execute(
+                    sa.text('UPDATE sys_user SET phone_reverse = :phone_reverse WHERE id = :id'),
+                    [{'id': row.id, 'phone_reverse': row.phone[::-1]} for row in rows],
+                )
+
+    existing = _existing_indexes()
+    for name, index_columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'sys_user', index_columns)
+    if bind.dialect.name == 'mysql':
+        # ngram 全文索引创建时关闭停用词，否则包含停用词字母的分词不会被索引
+        op.execute('SET SESSION innodb_ft_enable_stopword = OFF')
+        for name, column in FULLTEXT_INDEXES.items():
+            if name not in existing:
+                op.execute(f'CREATE FULLTEXT INDEX {name} ON sys_user ({column}) WITH PARSER ngram')
+
+
+def downgrade():
+    existing = _existing_indexes()
+    for name in [*FULLTEXT_INDEXES, *INDEXES]:
+        if name in existing:
+            op.drop_index(name, table_name='sys_user')
+    op.drop_column('sys_user', 'phone_reverse')
@@ -20,11 +20,12 @@ async def swagger_login(form_data: OAuth2PasswordRequestForm = Depends()) -> Get
 
 
 @router.post('/login', summary='验证码登录')
-async def user_login(request: Request, obj: AuthLoginParam) -> ResponseSchemaModel[GetLoginToken]:
-    data = await auth_service.login(request=request, obj=obj)
+async def user_login(obj: AuthLoginParam) -> ResponseSchemaModel[GetLoginToken]:
+    data = await auth_service.login(obj=obj)
     return response_base.success(data=data)
 
 
 @router.post('/logout', summary='用户登出', dependencies=[DependsJwtAuth])
-async def user_logout() -> ResponseModel:
+async def user_logout(request: Request) -> ResponseModel:
+    await auth_service.logout(request=request)
     return response_base.success()
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import APIRouter
+
+from backend.app.admin.api.v1.monitor.metrics import router as metrics_router
+
+router = APIRouter(prefix='/monitors')
+
+router.include_router(metrics_router, prefix='/metrics', tags=['系统监控'])
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from backend.app.admin.service.captcha_service import captcha_service
+from backend.common.response.response_schema import ResponseModel, response_base
+from backend.core.lifecycle import lifecycle
+from backend.common.security.jwt import DependsJwtAuth
+from backend.common.security.password import password_hash_pool
+from backend.common.security.revocation import token_revocation
+from backend.database.db import get_pools, pool_autosizer, slow_query_log
+from backend.database.pool import InstrumentedQueuePool
+from backend.database.query_counter import query_counter
+from backend.utils.health_check import health_prober
+from backend.utils.rate_limit import rate_limiter
+
+router = APIRouter()
+
+
+@router.get('/password-hash', summary='密码哈希进程池指标', dependencies=[DependsJwtAuth])
+async def get_password_hash_metrics() -> ResponseModel:
+    return response_base.success(data=password_hash_pool.metrics())
+
+
+@router.get('/token-revocation', summary='Token 吊销列表指标', dependencies=[DependsJwtAuth])
+async def get_token_revocation_metrics() -> ResponseModel:
+    return response_base.success(data=token_revocation.metrics())
+
+
+@router.get('/captcha-pool', summary='验证码池指标', dependencies=[DependsJwtAuth])
+async def get_captcha_pool_metrics() -> ResponseModel:
+    return response_base.success(data=captcha_service.metrics())
+
+
+@router.get('/rate-limit', summary='限流指标', dependencies=[DependsJwtAuth])
+async def get_rate_limit_metrics() -> ResponseModel:
+    return response_base.success(data=rate_limiter.metrics())
+
+
+@router.get('/db-pool', summary='数据库连接池指标', dependencies=[DependsJwtAuth])
+async def get_db_pool_metrics() -> ResponseModel:
+    pools = {name: pool.stats() for name, pool in get_pools().items() if isinstance(pool, InstrumentedQueuePool)}
+    data = {'pools': pools, 'autosize': pool_autosizer.mode, 'suggestions': pool_autosizer.suggestions}
+    return response_base.success(data=data)
+
+
+@router.get('/db-queries', summary='路由 SQL 执行数量指标', dependencies=[DependsJwtAuth])
+async def get_db_query_metrics() -> ResponseModel:
+    return response_base.success(data=query_counter.metrics())
+
+
+@router.get('/slow-queries', summary='SQL 指纹耗时及慢查询指标', dependencies=[DependsJwtAuth])
+async def get_slow_query_metrics(top: Annotated[int, Query(ge=1, le=500)] = 50) -> ResponseModel:
+    return response_base.success(data=slow_query_log.metrics(top))
+
+
+@router.get('/lifecycle', summary='进程生命周期指标', dependencies=[DependsJwtAuth])
+async def get_lifecycle_metrics() -> ResponseModel:
+    return response_base.success(data=lifecycle.metrics())
+
+
+@router.get('/health', summary='依赖健康探测指标', dependencies=[DependsJwtAuth])
+async def get_health_metrics() -> ResponseModel:
+    return response_base.success(data=health_prober.metrics())
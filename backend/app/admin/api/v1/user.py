@@ -2,19 +2,26 @@
 # -*- coding: utf-8 -*-
 from typing import Annotated
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
+from backend.common.enums import ExportFormatType, SearchMatchType
 from backend.common.security.jwt import CurrentUser, DependsJwtAuth
-from backend.common.pagination import paging_data, DependsPagination, PageData
+from backend.common.pagination import (
+    paging_data,
+    DependsPagination,
+    DependsCursorPagination,
+)
 from backend.common.response.response_schema import response_base, ResponseModel, ResponseSchemaModel
-from backend.database.db import CurrentSession
+from backend.database.db import CurrentReadSession
 from backend.app.admin.schema.user import (
     RegisterUserParam,
-    GetUserInfoDetail,
     ResetPassword,
     UpdateUserParam,
     AvatarParam,
+    GetUserImportDetail,
 )
+from backend.app.admin.service.user_import_service import UserImportService
 from backend.app.admin.service.user_service import UserService
 
 router = APIRouter()
@@ -34,10 +41,81 @@ async def password_reset(obj: ResetPassword) -> ResponseModel:
     return response_base.fail()
 
 
+@router.post(
+    '/import',
+    summary='批量导入用户',
+    description='请求体为 CSV（表头 username,password,email）或 NDJSON（每行一个 JSON 对象），流式解析并分批导入',
+    response_model=ResponseSchemaModel[GetUserImportDetail],
+    dependencies=[DependsJwtAuth],
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'text/csv': {'schema': {'type': 'string'}},
+                'application/x-ndjson': {'schema': {'type': 'string'}},
+            },
+        }
+    },
+)
+async def import_users(current_user: CurrentUser, request: Request) -> ResponseModel:
+    data = await UserImportService.import_users(current_user=current_user, request=request)
+    return response_base.success(data=data)
+
+
+@router.get(
+    '/export',
+    summary='（模糊条件）流式导出所有用户',
+    description='不分页，按服务端游标分批读取并逐批输出，格式为 NDJSON 或 CSV',
+    dependencies=[DependsJwtAuth],
+)
+async def export_users(
+    username: Annotated[str | None, Query()] = None,
+    phone: Annotated[str | None, Query()] = None,
+    status: Annotated[int | None, Query()] = None,
+    username_match: Annotated[SearchMatchType, Query(description='用户名匹配方式')] = SearchMatchType.contains,
+    phone_match: Annotated[SearchMatchType, Query(description='手机号匹配方式')] = SearchMatchType.contains,
+    format: Annotated[ExportFormatType, Query(description='导出格式')] = ExportFormatType.ndjson,
+) -> StreamingResponse:
+    user_select = await UserService.get_select(
+        username=username, phone=phone, status=status, username_match=username_match, phone_match=phone_match
+    )
+    media_type = 'text/csv' if format == ExportFormatType.csv else 'application/x-ndjson'
+    return StreamingResponse(
+        UserService.export(stmt=user_select, format=format),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename=users.{format.value}'},
+    )
+
+
+@router.get(
+    '/cursor',
+    summary='（模糊条件）游标分页获取所有用户',
+    dependencies=[
+        DependsJwtAuth,
+        DependsCursorPagination,
+    ],
+)
+async def get_all_users_by_cursor(
+    db: CurrentReadSession,
+    username: Annotated[str | None, Query()] = None,
+    phone: Annotated[str | None, Query()] = None,
+    status: Annotated[int | None, Query()] = None,
+    username_match: Annotated[SearchMatchType, Query(description='用户名匹配方式')] = SearchMatchType.contains,
+    phone_match: Annotated[SearchMatchType, Query(description='手机号匹配方式')] = SearchMatchType.contains,
+) -> Response:
+    user_select = await UserService.get_select(
+        username=username, phone=phone, status=status, username_match=username_match, phone_match=phone_match
+    )
+    page_data = await paging_data(
+        db, user_select, keyset=UserService.get_keyset(), transformer=UserService.to_user_infos
+    )
+    return response_base.fast_success(data=page_data)
+
+
 @router.get('/{username}', summary='查看用户信息', dependencies=[DependsJwtAuth])
-async def get_user(username: str) -> ResponseSchemaModel[GetUserInfoDetail]:
+async def get_user(username: str) -> Response:
     data = await UserService.get_userinfo(username=username)
-    return response_base.success(data=data)
+    return response_base.fast_success(data=data)
 
 
 @router.put('/{username}', summary='更新用户信息', dependencies=[DependsJwtAuth])
@@ -65,14 +143,18 @@ async def update_avatar(username: str, avatar: AvatarParam) -> ResponseModel:
     ],
 )
 async def get_all_users(
-    db: CurrentSession,
+    db: CurrentReadSession,
     username: Annotated[str | None, Query()] = None,
     phone: Annotated[str | None, Query()] = None,
     status: Annotated[int | None, Query()] = None,
-) -> ResponseSchemaModel[PageData[GetUserInfoDetail]]:
-    user_select = await UserService.get_select(username=username, phone=phone, status=status)
-    page_data = await paging_data(db, user_select)
-    return response_base.success(data=page_data)
+    username_match: Annotated[SearchMatchType, Query(description='用户名匹配方式')] = SearchMatchType.contains,
+    phone_match: Annotated[SearchMatchType, Query(description='手机号匹配方式')] = SearchMatchType.contains,
+) -> Response:
+    user_select = await UserService.get_select(
+        username=username, phone=phone, status=status, username_match=username_match, phone_match=phone_match
+    )
+    page_data = await paging_data(db, user_select, count='cached', transformer=UserService.to_user_infos)
+    return response_base.fast_success(data=page_data)
 
 
 @router.delete(
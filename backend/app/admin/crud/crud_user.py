@@ -3,14 +3,18 @@
 from datetime import datetime
 
 import bcrypt
-from sqlalchemy import select, update, desc, and_
+from sqlalchemy import select, update, desc, and_, case, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select
 from sqlalchemy_crud_plus import CRUDPlus
 
 from backend.app.admin.model import User
 from backend.app.admin.schema.user import RegisterUserParam, UpdateUserParam, AvatarParam
-from backend.common.security.jwt import get_hash_password
+from backend.common.enums import SearchMatchType
+from backend.common.security.password import password_hash_pool
+from backend.database.db import uuid4_str
+from backend.database.search import fulltext_contains, prefix_match, suffix_match
+from backend.utils.timezone import timezone
 
 
 class CRUDUser(CRUDPlus[User]):
@@ -34,9 +38,19 @@ class CRUDUser(CRUDPlus[User]):
         """
         return await self.select_model_by_column(db, username=username)
 
-    async def update_login_time(self, db: AsyncSession, username: str, login_time: datetime) -> int:
+    async def update_login_times(self, db: AsyncSession, login_times: dict[int, datetime]) -> int:
+        """
+        批量更新用户登录时间
+
+        :param db:
+        :param login_times: 用户 ID 与登录时间的映射
+        :return:
+        """
         user = await db.execute(
-            update(self.model).where(self.model.username == username).values(last_login_time=login_time)
+            update(self.model)
+            .where(self.model.id.in_(login_times.keys()))
+            .values(last_login_time=case(login_times, value=self.model.id))
+            .execution_options(synchronize_session=False)
         )
         return user.rowcount
 
@@ -49,12 +63,51 @@ class CRUDUser(CRUDPlus[User]):
         :return:
         """
         salt = bcrypt.gensalt()
-        obj.password = get_hash_password(obj.password, salt)
+        obj.password = await password_hash_pool.hash(obj.password, salt)
         dict_obj = obj.model_dump()
         dict_obj.update({'salt': salt})
         new_user = self.model(**dict_obj)
         db.add(new_user)
 
+    async def get_existing(
+        self, db: AsyncSession, usernames: list[str], emails: list[str]
+    ) -> tuple[set[str], set[str]]:
+        """
+        批量查询已注册的用户名和邮箱
+
+        :param db:
+        :param usernames:
+        :param emails:
+        :return:
+        """
+        existing_usernames = set()
+        existing_emails = set()
+        if usernames:
+            stmt = select(self.model.username).where(self.model.username.in_(usernames))
+            existing_usernames.update((await db.scalars(stmt)).all())
+        if emails:
+            stmt = select(self.model.email).where(self.model.email.in_(emails))
+            existing_emails.update((await db.scalars(stmt)).all())
+        return existing_usernames, existing_emails
+
+    async def bulk_create(self, db: AsyncSession, objs: list[RegisterUserParam], salts: list[bytes]) -> None:
+        """
+        批量创建用户，密码需已加密
+
+        :param db:
+        :param objs:
+        :param salts:
+        :return:
+        """
+        now = timezone.now()
+        await db.execute(
+            insert(self.model),
+            [
+                {**obj.model_dump(), 'salt': salt, 'uuid': uuid4_str(), 'join_time': now}
+                for obj, salt in zip(objs, salts, strict=True)
+            ],
+        )
+
     async def update_userinfo(self, db: AsyncSession, input_user: int, obj: UpdateUserParam) -> int:
         """
         更新用户信息
@@ -64,7 +117,10 @@ class CRUDUser(CRUDPlus[User]):
         :param obj:
         :return:
         """
-        return await self.update_model(db, input_user, obj)
+        kwargs = {}
+        if 'phone' in obj.model_fields_set:
+            kwargs.update({'phone_reverse': obj.phone[::-1] if obj.phone else None})
+        return await self.update_model(db, input_user, obj, **kwargs)
 
     async def update_avatar(self, db: AsyncSession, input_user: int, avatar: AvatarParam) -> int:
         """
@@ -108,22 +164,44 @@ class CRUDUser(CRUDPlus[User]):
         """
         return await self.update_model(db, pk, {'password': new_pwd})
 
-    async def get_list(self, username: str = None, phone: str = None, status: int = None) -> Select:
+    async def get_list(
+        self,
+        username: str = None,
+        phone: str = None,
+        status: int = None,
+        username_match: SearchMatchType = SearchMatchType.contains,
+        phone_match: SearchMatchType = SearchMatchType.contains,
+    ) -> Select:
         """
         获取用户列表
 
+        前缀匹配使用 username/phone 索引，手机号后缀匹配使用 phone_reverse 索引，包含匹配使用 ngram 全文索引；
+        用户名后缀匹配无法使用索引
+
         :param username:
         :param phone:
         :param status:
+        :param username_match: 用户名匹配方式
+        :param phone_match: 手机号匹配方式
         :return:
         """
-        stmt = select(self.model).order_by(desc(self.model.join_time))
+        stmt = select(self.model).order_by(desc(self.model.join_time), desc(self.model.id))
 
         filters = []
         if username:
-            filters.append(self.model.username.like(f'%{username}%'))
+            if username_match == SearchMatchType.prefix:
+                filters.append(prefix_match(self.model.username, username))
+            elif username_match == SearchMatchType.suffix:
+                filters.append(suffix_match(self.model.username, username))
+            else:
+                filters.append(fulltext_contains(self.model.username, username))
         if phone:
-            filters.append(self.model.phone.like(f'%{phone}%'))
+            if phone_match == SearchMatchType.prefix:
+                filters.append(prefix_match(self.model.phone, phone))
+            elif phone_match == SearchMatchType.suffix:
+                filters.append(prefix_match(self.model.phone_reverse, phone[::-1]))
+            else:
+                filters.append(fulltext_contains(self.model.phone, phone))
         if status is not None:
             filters.append(self.model.status == status)
 
@@ -132,5 +210,10 @@ class CRUDUser(CRUDPlus[User]):
 
         return stmt
 
+    @property
+    def list_keyset(self) -> tuple:
+        """用户列表游标分页排序列，与 get_list 排序一致"""
+        return self.model.join_time, self.model.id
+
 
 user_dao: CRUDUser = CRUDUser(User)
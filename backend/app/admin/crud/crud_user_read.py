@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import AsyncIterator, Sequence
+
+import msgspec
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.admin.model import User
+from backend.core.conf import settings
+
+
+class UserInfo(msgspec.Struct, gc=False):
+    """用户信息只读模型，字段与 GetUserInfoDetail 一致，时间已格式化为字符串"""
+
+    username: str
+    email: str
+    phone: str | None
+    id: int
+    uuid: str
+    avatar: str | None
+    status: int
+    is_superuser: bool
+    join_time: str
+    last_login_time: str | None
+
+
+class CRUDUserRead:
+    """
+    用户只读查询
+
+    仅查询返回所需的列并直接构建 msgspec Struct，不经过 ORM 实例和 pydantic 校验，写入仍使用 CRUDUser
+    """
+
+    columns = (
+        User.username,
+        User.email,
+        User.phone,
+        User.id,
+        User.uuid,
+        User.avatar,
+        User.status,
+        User.is_superuser,
+        User.join_time,
+        User.last_login_time,
+    )
+
+    def to_structs(self, rows: Sequence[Row]) -> list[UserInfo]:
+        """
+        将查询结果行转换为只读模型
+
+        :param rows:
+        :return:
+        """
+        fmt = settings.DATETIME_FORMAT
+        return [
+            UserInfo(
+                username,
+                email,
+                phone,
+                pk,
+                uuid,
+                avatar,
+                status,
+                bool(is_superuser),
+                join_time.strftime(fmt),
+                last_login_time.strftime(fmt) if last_login_time else None,
+            )
+            for username, email, phone, pk, uuid, avatar, status, is_superuser, join_time, last_login_time in rows
+        ]
+
+    def select(self, stmt: Select | None = None) -> Select:
+        """
+        只读查询，传入 ORM 查询时保留其过滤和排序条件，仅替换查询列
+
+        :param stmt:
+        :return:
+        """
+        if stmt is None:
+            return select(*self.columns)
+        return stmt.with_only_columns(*self.columns)
+
+    async def _get_one(self, db: AsyncSession, stmt: Select) -> UserInfo | None:
+        row = (await db.execute(stmt)).first()
+        return self.to_structs([row])[0] if row else None
+
+    async def get(self, db: AsyncSession, user_id: int) -> UserInfo | None:
+        """
+        获取用户
+
+        :param db:
+        :param user_id:
+        :return:
+        """
+        return await self._get_one(db, self.select().where(User.id == user_id))
+
+    async def get_by_username(self, db: AsyncSession, username: str) -> UserInfo | None:
+        """
+        通过 username 获取用户
+
+        :param db:
+        :param username:
+        :return:
+        """
+        return await self._get_one(db, self.select().where(User.username == username))
+
+    async def stream(self, db: AsyncSession, stmt: Select) -> AsyncIterator[list[UserInfo]]:
+        """
+        使用服务端游标分批读取，内存占用与结果集大小无关
+
+        :param db:
+        :param stmt: 只读查询
+        :return:
+        """
+        result = await db.stream(stmt.execution_options(yield_per=settings.USER_EXPORT_YIELD_PER))
+        async for rows in result.partitions():
+            yield self.to_structs(rows)
+
+
+user_read_dao: CRUDUserRead = CRUDUserRead()
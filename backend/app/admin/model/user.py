@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 
-from sqlalchemy import String, VARBINARY
+from sqlalchemy import DDL, Index, String, VARBINARY, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.common.model import DataClassBase, id_key
@@ -14,6 +14,13 @@ class User(DataClassBase):
     """用户表"""
 
     __tablename__ = 'sys_user'
+    __table_args__ = (
+        Index('ix_sys_user_join_time_id', 'join_time', 'id'),
+        Index('ft_sys_user_username', 'username', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(
+            dialect='mysql'
+        ),
+        Index('ft_sys_user_phone', 'phone', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
 
     id: Mapped[id_key] = mapped_column(init=False)
     uuid: Mapped[str] = mapped_column(String(50), init=False, default_factory=uuid4_str, unique=True)
@@ -24,6 +31,15 @@ class User(DataClassBase):
     status: Mapped[int] = mapped_column(default=1, comment='用户账号状态(0停用 1正常)')
     is_superuser: Mapped[bool] = mapped_column(default=False, comment='超级权限(0否 1是)')
     avatar: Mapped[str | None] = mapped_column(String(255), default=None, comment='头像')
-    phone: Mapped[str | None] = mapped_column(String(11), default=None, comment='手机号')
+    phone: Mapped[str | None] = mapped_column(String(11), default=None, index=True, comment='手机号')
+    phone_reverse: Mapped[str | None] = mapped_column(
+        String(11), init=False, default=None, index=True, comment='倒序手机号，用于后缀搜索'
+    )
     join_time: Mapped[datetime] = mapped_column(init=False, default_factory=timezone.now, comment='注册时间')
     last_login_time: Mapped[datetime | None] = mapped_column(init=False, onupdate=timezone.now, comment='上次登录')
+
+
+# ngram 全文索引创建时关闭停用词，否则包含停用词字母的分词不会被索引
+event.listen(
+    User.__table__, 'before_create', DDL('SET SESSION innodb_ft_enable_stopword = OFF').execute_if(dialect='mysql')
+)
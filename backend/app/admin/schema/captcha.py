@@ -6,5 +6,6 @@ from backend.common.schema import SchemaBase
 
 
 class GetCaptchaDetail(SchemaBase):
+    uuid: str = Field(description='验证码 UUID')
     image_type: str = Field(description='图片类型')
     image: str = Field(description='图片内容')
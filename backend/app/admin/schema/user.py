@@ -13,6 +13,7 @@ class AuthSchemaBase(SchemaBase):
 
 
 class AuthLoginParam(AuthSchemaBase):
+    uuid: str = Field(description='验证码 UUID')
     captcha: str = Field(description='验证码')
 
 
@@ -47,3 +48,16 @@ class ResetPassword(SchemaBase):
     old_password: str = Field(description='旧密码')
     new_password: str = Field(description='新密码')
     confirm_password: str = Field(description='确认密码')
+
+
+class UserImportError(SchemaBase):
+    line: int = Field(description='行号')
+    username: str | None = Field(None, description='用户名')
+    msg: str = Field(description='错误信息')
+
+
+class GetUserImportDetail(SchemaBase):
+    total: int = Field(description='总行数')
+    created: int = Field(description='成功导入数')
+    failed: int = Field(description='失败数')
+    errors: list[UserImportError] = Field([], description='失败明细，最多返回 USER_IMPORT_MAX_ERRORS 条')
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from backend.common.log import log
+from backend.core.conf import settings
+
+
+def _render_captcha(img_byte: str) -> tuple[str, str]:
+    # fast_captcha 依赖 PIL，导入较慢，在渲染线程中首次使用时导入，不影响启动和事件循环
+    from fast_captcha import img_captcha
+
+    return img_captcha(img_byte=img_byte)
+
+
+class CaptchaService:
+    """
+    验证码预生成池
+
+    后台任务使用独立线程预先渲染验证码，池内数量低于 CAPTCHA_POOL_LOW_WATER 时补充至 CAPTCHA_POOL_SIZE，
+    接口只需从池中取出；池为空时回退为即时渲染。首次获取验证码时才开始预生成，不使用验证码的进程不加载渲染依赖
+    """
+
+    img_type: str = 'base64'
+
+    def __init__(self) -> None:
+        self._pool: deque[tuple[str, str]] = deque()
+        self._refill = asyncio.Event()
+        self._executor: ThreadPoolExecutor | None = None
+        self._task: asyncio.Task | None = None
+        self._produced_at: deque[float] = deque(maxlen=settings.CAPTCHA_POOL_SIZE * 10)
+        self._produced = 0
+        self._hits = 0
+        self._misses = 0
+
+    async def _render(self) -> tuple[str, str]:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='captcha')
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(_render_captcha, self.img_type))
+
+    async def get(self) -> tuple[str, str]:
+        """
+        获取验证码
+
+        :return: 图片内容和验证码
+        """
+        try:
+            captcha = self._pool.popleft()
+            self._hits += 1
+        except IndexError:
+            self._misses += 1
+            captcha = await self._render()
+        if len(self._pool) < settings.CAPTCHA_POOL_LOW_WATER:
+            self._refill.set()
+        return captcha
+
+    async def _produce(self) -> None:
+        while True:
+            await self._refill.wait()
+            self._refill.clear()
+            while len(self._pool) < settings.CAPTCHA_POOL_SIZE:
+                try:
+                    captcha = await self._render()
+                except Exception as e:
+                    log.error('❌ 验证码生成失败 {}', e)
+                    await asyncio.sleep(1)
+                    continue
+                self._pool.append(captcha)
+                self._produced += 1
+                self._produced_at.append(time.monotonic())
+
+    def start(self) -> None:
+        """启动后台生成任务，首次获取验证码时开始生成"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._produce())
+
+    async def stop(self) -> None:
+        """停止后台生成任务"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def metrics(self) -> dict[str, Any]:
+        """验证码池指标"""
+        window_start = time.monotonic() - 60
+        recent = sum(1 for produced_at in self._produced_at if produced_at >= window_start)
+        return {
+            'depth': len(self._pool),
+            'size': settings.CAPTCHA_POOL_SIZE,
+            'low_water': settings.CAPTCHA_POOL_LOW_WATER,
+            'produced': self._produced,
+            'refill_rate_per_second': round(recent / 60, 3),
+            'hits': self._hits,
+            'misses': self._misses,
+        }
+
+
+captcha_service: CaptchaService = CaptchaService()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+from datetime import datetime
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import async_db_session
+
+
+class LoginTimeService:
+    """
+    用户登录时间延迟写入
+
+    登录时仅将登录时间写入内存缓冲区，由后台任务定时或在缓冲区达到上限时合并为一条 UPDATE 批量写入，
+    服务关闭时通知后台任务在当前写入完成后退出，再写入剩余数据；不取消后台任务，避免丢失写入中的数据
+    """
+
+    def __init__(self) -> None:
+        self._buffer: dict[int, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def record(self, user_id: int, login_time: datetime) -> None:
+        """
+        记录用户登录时间
+
+        :param user_id:
+        :param login_time:
+        :return:
+        """
+        self._buffer[user_id] = login_time
+        if len(self._buffer) >= settings.LOGIN_TIME_BUFFER_MAXSIZE:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """写入缓冲区中的登录时间"""
+        if not self._buffer:
+            return
+        login_times, self._buffer = self._buffer, {}
+        try:
+            async with async_db_session.begin() as db:
+                await user_dao.update_login_times(db, login_times)
+        except Exception as e:
+            log.error('❌ 用户登录时间写入失败 {}', e)
+            # 写入失败时放回缓冲区，保留较新的登录时间
+            for user_id, login_time in login_times.items():
+                buffered = self._buffer.get(user_id)
+                if buffered is None or buffered < login_time:
+                    self._buffer[user_id] = login_time
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.LOGIN_TIME_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """启动后台写入任务"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台写入任务并写入剩余数据"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+
+login_time_service: LoginTimeService = LoginTimeService()
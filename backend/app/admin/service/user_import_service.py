@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import codecs
+import csv
+import json
+
+from typing import AsyncIterator
+
+import bcrypt
+
+from fastapi import Request
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.model import User
+from backend.app.admin.schema.user import GetUserImportDetail, GetUserInfoDetail, RegisterUserParam, UserImportError
+from backend.app.admin.service.user_service import REGISTER_CONFLICT_MSGS
+from backend.common.exception import errors
+from backend.common.pagination import invalidate_count_cache
+from backend.common.security.jwt import superuser_verify
+from backend.common.security.password import password_hash_pool
+from backend.core.conf import settings
+from backend.database.constraint import get_unique_violation
+from backend.database.db import after_commit, async_db_session, release_read_session, unit_of_work
+
+CSV_CONTENT_TYPES = ('text/csv',)
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/json-lines')
+CSV_MAX_RECORD_LINES = 100
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer
+
+
+async def _iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, list[str], str | None]]:
+    """
+    按 RFC 4180 将行合并为记录：引号未闭合时继续读取下一行，引号内的换行和逗号属于字段内容
+
+    :param lines:
+    :return: (记录起始行号, 字段列表, 解析错误)
+    """
+    buffer: list[str] = []
+    start = line_no = quotes = 0
+    async for line in lines:
+        line_no += 1
+        if not buffer:
+            if not line.strip():
+                continue
+            start = line_no
+        buffer.append(line)
+        quotes += line.count('"')
+        # 转义的引号成对出现，引号总数为偶数时记录结束
+        if quotes % 2:
+            if len(buffer) >= CSV_MAX_RECORD_LINES:
+                yield start, [], f'引号未闭合，单条记录超过 {CSV_MAX_RECORD_LINES} 行'
+                buffer, quotes = [], 0
+            continue
+        yield start, next(csv.reader(part + '\n' for part in buffer)), None
+        buffer, quotes = [], 0
+    if buffer:
+        yield start, [], '引号未闭合'
+
+
+def _format_error(e: ValidationError) -> str:
+    return '; '.join(f'{".".join(map(str, error["loc"]))}: {error["msg"]}' for error in e.errors())
+
+
+class _ImportReport:
+    def __init__(self) -> None:
+        self.total = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: list[UserImportError] = []
+
+    def fail(self, line: int, username: str | None, msg: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.USER_IMPORT_MAX_ERRORS:
+            self.errors.append(UserImportError(line=line, username=username, msg=msg))
+
+    def detail(self) -> GetUserImportDetail:
+        errors = sorted(self.errors, key=lambda error: error.line)
+        return GetUserImportDetail(total=self.total, created=self.created, failed=self.failed, errors=errors)
+
+
+class UserImportService:
+    @staticmethod
+    async def _parse(request: Request) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+        """
+        逐行解析上传内容，不将整个文件读入内存
+
+        :param request:
+        :return: (行号, 行数据, 解析错误)
+        """
+        content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+        lines = _iter_lines(request.stream())
+        if content_type in CSV_CONTENT_TYPES:
+            header: list[str] | None = None
+            async for line_no, values, error in _iter_csv_records(lines):
+                if error:
+                    yield line_no, None, error
+                    continue
+                if header is None:
+                    header = [value.strip() for value in values]
+                    continue
+                if len(values) != len(header):
+                    yield line_no, None, f'列数与表头不一致，应为 {len(header)} 列'
+                    continue
+                yield line_no, dict(zip(header, values)), None
+        elif content_type in NDJSON_CONTENT_TYPES:
+            line_no = 0
+            async for line in lines:
+                line_no += 1
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield line_no, None, 'JSON 格式错误'
+                    continue
+                if not isinstance(row, dict):
+                    yield line_no, None, '每行应为 JSON 对象'
+                    continue
+                yield line_no, row, None
+        else:
+            raise errors.RequestError(msg='仅支持 text/csv 或 application/x-ndjson 格式')
+
+    @staticmethod
+    async def _insert_batch(batch: list[tuple[int, RegisterUserParam]], report: _ImportReport) -> None:
+        """
+        导入一批用户：批量查询已注册的用户名和邮箱，并行加密密码后一次插入；
+        插入时因并发注册等原因违反唯一约束，则逐行重试以定位失败的行
+
+        每批在独立的工作单元中提交，不加入请求工作单元，避免长事务持有唯一索引锁；加密密码期间不持有连接
+
+        :param batch: (行号, 用户) 列表
+        :param report:
+        :return:
+        """
+        async with async_db_session() as db:
+            usernames, emails = await user_dao.get_existing(
+                db, [obj.username for _, obj in batch], [obj.email for _, obj in batch]
+            )
+        rows = []
+        for line_no, obj in batch:
+            if obj.username in usernames:
+                report.fail(line_no, obj.username, '用户已注册')
+            elif obj.email in emails:
+                report.fail(line_no, obj.username, '邮箱已注册')
+            else:
+                rows.append((line_no, obj))
+        if not rows:
+            return
+        salts = [bcrypt.gensalt() for _ in rows]
+        hashed = await password_hash_pool.hash_many([(obj.password, salt) for (_, obj), salt in zip(rows, salts)])
+        for (_, obj), password in zip(rows, hashed):
+            obj.password = password
+        try:
+            async with unit_of_work() as uow:
+                await user_dao.bulk_create(uow.session(), [obj for _, obj in rows], salts)
+                await after_commit(invalidate_count_cache, User.__tablename__)
+            report.created += len(rows)
+        except IntegrityError:
+            for (line_no, obj), salt in zip(rows, salts):
+                try:
+                    async with unit_of_work() as uow:
+                        await user_dao.bulk_create(uow.session(), [obj], [salt])
+                        await after_commit(invalidate_count_cache, User.__tablename__)
+                    report.created += 1
+                except IntegrityError as e:
+                    name = get_unique_violation(e, User.__table__)
+                    report.fail(line_no, obj.username, REGISTER_CONFLICT_MSGS.get(name, '用户名或邮箱已注册'))
+
+    @staticmethod
+    async def import_users(*, current_user: GetUserInfoDetail, request: Request) -> GetUserImportDetail:
+        """
+        批量导入用户
+
+        请求体为 CSV（表头 username,password,email）或 NDJSON（每行一个 JSON 对象），按 USER_IMPORT_BATCH_SIZE
+        分批校验、去重、加密和插入，单行失败不影响其他行，已提交的批次不受后续失败影响
+
+        :param current_user:
+        :param request:
+        :return:
+        """
+        superuser_verify(current_user)
+        # 导入耗时较长，归还请求工作单元中获取当前用户时占用的连接
+        await release_read_session()
+        report = _ImportReport()
+        batch: list[tuple[int, RegisterUserParam]] = []
+        seen_usernames: set[str] = set()
+        seen_emails: set[str] = set()
+        async for line_no, row, error in UserImportService._parse(request):
+            report.total += 1
+            if error:
+                report.fail(line_no, None, error)
+                continue
+            username = str(row['username']) if row.get('username') is not None else None
+            try:
+                obj = RegisterUserParam.model_validate(row)
+            except ValidationError as e:
+                report.fail(line_no, username, _format_error(e))
+                continue
+            if not obj.password:
+                report.fail(line_no, obj.username, '密码为空')
+                continue
+            if obj.username in seen_usernames:
+                report.fail(line_no, obj.username, '用户名在文件中重复')
+                continue
+            if obj.email in seen_emails:
+                report.fail(line_no, obj.username, '邮箱在文件中重复')
+                continue
+            seen_usernames.add(obj.username)
+            seen_emails.add(obj.email)
+            batch.append((line_no, obj))
+            if len(batch) >= settings.USER_IMPORT_BATCH_SIZE:
+                await UserImportService._insert_batch(batch, report)
+                batch = []
+        if batch:
+            await UserImportService._insert_batch(batch, report)
+        return report.detail()
@@ -1,88 +1,161 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from sqlalchemy import Select
+import csv
+import io
 
+from typing import AsyncIterator, Sequence
+
+import msgspec
+
+from sqlalchemy import Row, Select
+from sqlalchemy.exc import IntegrityError
+
+from backend.common.enums import ExportFormatType, SearchMatchType
 from backend.common.exception import errors
-from backend.common.security.jwt import superuser_verify, password_verify, get_hash_password
+from backend.common.pagination import invalidate_count_cache
+from backend.common.security.jwt import superuser_verify, clear_user_cache
+from backend.common.security.password import password_hash_pool
 from backend.app.admin.crud.crud_user import user_dao
-from backend.database.db import async_db_session
+from backend.app.admin.crud.crud_user_read import UserInfo, user_read_dao
+from backend.database.constraint import get_unique_violation
+from backend.database.db import after_commit, async_db_read_session, current_read_session, current_session
 from backend.app.admin.model import User
-from backend.app.admin.schema.user import RegisterUserParam, ResetPassword, UpdateUserParam, AvatarParam
+from backend.app.admin.schema.user import (
+    RegisterUserParam,
+    ResetPassword,
+    UpdateUserParam,
+    AvatarParam,
+    GetUserInfoDetail,
+)
+
+_json_encoder = msgspec.json.Encoder()
+
+# 唯一索引名称与冲突提示，写入时依赖唯一索引判重，不再预先查询
+REGISTER_CONFLICT_MSGS = {'ix_sys_user_username': '用户已注册', 'ix_sys_user_email': '邮箱已注册'}
+UPDATE_CONFLICT_MSGS = {'ix_sys_user_username': '用户名已注册', 'ix_sys_user_email': '邮箱已注册'}
+
+
+def _raise_conflict(e: IntegrityError, messages: dict[str, str]) -> None:
+    name = get_unique_violation(e, User.__table__)
+    if name in messages:
+        raise errors.ForbiddenError(msg=messages[name]) from e
+    raise e
+
+
+def _encode_csv(rows: list[tuple]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
 
 
 class UserService:
     @staticmethod
     async def register(*, obj: RegisterUserParam) -> None:
-        async with async_db_session.begin() as db:
-            if not obj.password:
-                raise errors.ForbiddenError(msg='密码为空')
-            username = await user_dao.get_by_username(db, obj.username)
-            if username:
-                raise errors.ForbiddenError(msg='用户已注册')
-            email = await user_dao.check_email(db, obj.email)
-            if email:
-                raise errors.ForbiddenError(msg='邮箱已注册')
-            await user_dao.create(db, obj)
+        if not obj.password:
+            raise errors.ForbiddenError(msg='密码为空')
+        try:
+            async with current_session() as db:
+                await user_dao.create(db, obj)
+                await after_commit(invalidate_count_cache, User.__tablename__)
+        except IntegrityError as e:
+            _raise_conflict(e, REGISTER_CONFLICT_MSGS)
 
     @staticmethod
     async def pwd_reset(*, obj: ResetPassword) -> int:
-        async with async_db_session.begin() as db:
+        async with current_session() as db:
             user = await user_dao.get_by_username(db, obj.username)
-            if not password_verify(obj.old_password, user.password):
+            if not await password_hash_pool.verify(obj.old_password, user.password):
                 raise errors.ForbiddenError(msg='原密码错误')
             np1 = obj.new_password
             np2 = obj.confirm_password
             if np1 != np2:
                 raise errors.ForbiddenError(msg='密码输入不一致')
-            new_pwd = get_hash_password(obj.new_password, user.salt)
+            new_pwd = await password_hash_pool.hash(obj.new_password, user.salt)
             count = await user_dao.reset_password(db, user.id, new_pwd)
-            return count
+            await after_commit(clear_user_cache, user.id)
+        return count
 
     @staticmethod
-    async def get_userinfo(*, username: str) -> User:
-        async with async_db_session() as db:
-            user = await user_dao.get_by_username(db, username)
+    async def get_userinfo(*, username: str) -> UserInfo:
+        async with current_read_session() as db:
+            user = await user_read_dao.get_by_username(db, username)
             if not user:
                 raise errors.NotFoundError(msg='用户不存在')
             return user
 
     @staticmethod
     async def update(*, username: str, obj: UpdateUserParam) -> int:
-        async with async_db_session.begin() as db:
-            input_user = await user_dao.get_by_username(db, username=username)
-            if not input_user:
-                raise errors.NotFoundError(msg='用户不存在')
-            superuser_verify(input_user)
-            if input_user.username != obj.username:
-                _username = await user_dao.get_by_username(db, obj.username)
-                if _username:
-                    raise errors.ForbiddenError(msg='用户名已注册')
-            if input_user.email != obj.email:
-                email = await user_dao.check_email(db, obj.email)
-                if email:
-                    raise errors.ForbiddenError(msg='邮箱已注册')
-            count = await user_dao.update_userinfo(db, input_user.id, obj)
-            return count
+        try:
+            async with current_session() as db:
+                input_user = await user_dao.get_by_username(db, username=username)
+                if not input_user:
+                    raise errors.NotFoundError(msg='用户不存在')
+                superuser_verify(input_user)
+                count = await user_dao.update_userinfo(db, input_user.id, obj)
+                await after_commit(clear_user_cache, input_user.id)
+                await after_commit(invalidate_count_cache, User.__tablename__)
+        except IntegrityError as e:
+            _raise_conflict(e, UPDATE_CONFLICT_MSGS)
+        return count
 
     @staticmethod
     async def update_avatar(*, username: str, avatar: AvatarParam) -> int:
-        async with async_db_session.begin() as db:
+        async with current_session() as db:
             input_user = await user_dao.get_by_username(db, username)
             if not input_user:
                 raise errors.NotFoundError(msg='用户不存在')
             count = await user_dao.update_avatar(db, input_user.id, avatar)
-            return count
+            await after_commit(clear_user_cache, input_user.id)
+        return count
+
+    @staticmethod
+    async def get_select(
+        *,
+        username: str = None,
+        phone: str = None,
+        status: int = None,
+        username_match: SearchMatchType = SearchMatchType.contains,
+        phone_match: SearchMatchType = SearchMatchType.contains,
+    ) -> Select:
+        stmt = await user_dao.get_list(
+            username=username, phone=phone, status=status, username_match=username_match, phone_match=phone_match
+        )
+        return user_read_dao.select(stmt)
+
+    @staticmethod
+    def to_user_infos(rows: Sequence[Row]) -> list[UserInfo]:
+        return user_read_dao.to_structs(rows)
+
+    @staticmethod
+    async def export(*, stmt: Select, format: ExportFormatType) -> AsyncIterator[bytes]:
+        """
+        流式导出用户，响应体在请求工作单元结束后发送，因此使用独立的只读 session，按服务端游标分批读取并编码
+
+        :param stmt: 只读查询
+        :param format: 导出格式
+        :return:
+        """
+        async with async_db_read_session() as db:
+            if format == ExportFormatType.csv:
+                yield _encode_csv([UserInfo.__struct_fields__])
+            async for users in user_read_dao.stream(db, stmt):
+                if format == ExportFormatType.csv:
+                    yield _encode_csv([msgspec.structs.astuple(user) for user in users])
+                else:
+                    yield _json_encoder.encode_lines(users)
 
     @staticmethod
-    async def get_select(*, username: str = None, phone: str = None, status: int = None) -> Select:
-        return await user_dao.get_list(username=username, phone=phone, status=status)
+    def get_keyset() -> tuple:
+        return user_dao.list_keyset
 
     @staticmethod
-    async def delete(*, current_user: User, username: str) -> int:
-        async with async_db_session.begin() as db:
+    async def delete(*, current_user: GetUserInfoDetail, username: str) -> int:
+        async with current_session() as db:
             superuser_verify(current_user)
             input_user = await user_dao.get_by_username(db, username)
             if not input_user:
                 raise errors.NotFoundError(msg='用户不存在')
             count = await user_dao.delete(db, input_user.id)
-            return count
+            await after_commit(clear_user_cache, input_user.id)
+            await after_commit(invalidate_count_cache, User.__tablename__)
+        return count
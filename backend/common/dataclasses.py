@@ -1,2 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import dataclasses
+
+
+@dataclasses.dataclass
+class TokenPayload:
+    id: int
+    jti: str
+    expire_time: int
@@ -24,3 +24,18 @@ class StrEnum(_EnumBase, str, Enum):
     """字符串枚举"""
 
     pass
+
+
+class SearchMatchType(StrEnum):
+    """搜索匹配方式"""
+
+    prefix = 'prefix'
+    suffix = 'suffix'
+    contains = 'contains'
+
+
+class ExportFormatType(StrEnum):
+    """导出格式"""
+
+    ndjson = 'ndjson'
+    csv = 'csv'
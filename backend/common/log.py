@@ -79,6 +79,7 @@ def set_custom_logfile():
     # 日志文件
     log_access_file = os.path.join(log_path, settings.LOG_ACCESS_FILENAME)
     log_error_file = os.path.join(log_path, settings.LOG_ERROR_FILENAME)
+    log_slow_query_file = os.path.join(log_path, settings.LOG_SLOW_QUERY_FILENAME)
 
     # 日志文件通用配置
     # https://loguru.readthedocs.io/en/stable/api/logger.html#loguru._logger.Logger.add
@@ -110,5 +111,15 @@ def set_custom_logfile():
         **log_config,
     )
 
+    # 慢查询文件
+    logger.add(
+        str(log_slow_query_file),
+        level='WARNING',
+        filter=lambda record: record['extra'].get('slow_query', False),
+        backtrace=False,
+        diagnose=False,
+        **log_config,
+    )
+
 
 log = logger
@@ -2,23 +2,40 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import time
+
 from math import ceil
-from typing import TYPE_CHECKING, Generic, Sequence, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Generic, Literal, Sequence, TypeVar
+
+import msgspec
 
 from fastapi import Depends, Query
 from fastapi_pagination import pagination_ctx
-from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.api import request, resolve_params
+from fastapi_pagination.bases import AbstractPage, AbstractParams, CursorRawParams, RawParams
+from fastapi_pagination.ext.sqlalchemy import create_count_query, paginate
 from fastapi_pagination.links.bases import create_links
 from pydantic import BaseModel, Field
+from sqlalchemy import asc, bindparam, desc, text, tuple_
+
+from backend.common.exception import errors
+from backend.core.conf import settings
+from backend.database.explain import Explain
+from backend.database.redis import redis_client
 
 if TYPE_CHECKING:
-    from sqlalchemy import Select
+    from sqlalchemy import ColumnElement, Select
     from sqlalchemy.ext.asyncio import AsyncSession
 
 T = TypeVar('T')
 SchemaT = TypeVar('SchemaT')
 
+# 总条数统计方式：精确统计、redis 缓存、MySQL 统计信息估算、仅判断是否存在下一页
+CountMode = Literal['exact', 'cached', 'estimated', 'has_more']
+
 
 class _CustomPageParams(BaseModel, AbstractParams):
     page: int = Query(1, ge=1, description='Page number')
@@ -45,6 +62,7 @@ class _PageDetails(BaseModel):
     page: int = Field(..., description='当前页')
     size: int = Field(..., description='每页数量')
     total_pages: int = Field(..., description='总页数')
+    count_mode: CountMode = Field('exact', description='总条数统计方式，has_more 时总条数仅用于判断是否存在下一页')
     links: _Links
 
 
@@ -57,6 +75,9 @@ class _CustomPage(_PageDetails, AbstractPage[T], Generic[T]):
         items: list,
         total: int,
         params: _CustomPageParams,
+        *,
+        count_mode: CountMode = 'exact',
+        **kwargs: Any,
     ) -> _CustomPage[T]:
         page = params.page
         size = params.size
@@ -74,10 +95,214 @@ class _CustomPage(_PageDetails, AbstractPage[T], Generic[T]):
             page=params.page,
             size=params.size,
             total_pages=total_pages,
+            count_mode=count_mode,
             links=links,  # type: ignore
         )
 
 
+def _count_tables(select: Select) -> list[str]:
+    return sorted({table.name for table in select.get_final_froms() if hasattr(table, 'name')})
+
+
+def _count_digest(db: AsyncSession, select: Select) -> str:
+    # 排序不影响总条数，相同过滤条件的查询使用同一缓存
+    compiled = select.order_by(None).compile(dialect=db.get_bind().dialect)
+    return hashlib.sha1(f'{compiled}|{sorted(compiled.params.items())!r}'.encode()).hexdigest()
+
+
+async def _exact_count(db: AsyncSession, select: Select) -> int:
+    return (await db.execute(create_count_query(select))).scalar_one()
+
+
+async def _cached_count(db: AsyncSession, select: Select) -> int:
+    tables = _count_tables(select)
+    if not tables:
+        return await _exact_count(db, select)
+    digest = _count_digest(db, select)
+    keys = [f'{settings.PAGING_COUNT_REDIS_PREFIX}:{table}' for table in tables]
+    # 缓存写入每张表的 hash，任一表失效即重新统计
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.hget(key, digest)
+        cached = await pipe.execute()
+    now = time.time()
+    values = [value.split(':') for value in cached if value]
+    if len(values) == len(keys) and all(float(expire_at) > now for _, expire_at in values):
+        return int(values[0][0])
+    total = await _exact_count(db, select)
+    value = f'{total}:{now + settings.PAGING_COUNT_EXPIRE_SECONDS}'
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.hset(key, digest, value)
+            pipe.expire(key, settings.PAGING_COUNT_EXPIRE_SECONDS)
+        await pipe.execute()
+    return total
+
+
+async def _estimated_count(db: AsyncSession, select: Select) -> int | None:
+    if db.get_bind().dialect.name != 'mysql':
+        return None
+    tables = _count_tables(select)
+    if select.whereclause is None and len(tables) == 1:
+        stmt = text(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table'
+        ).bindparams(bindparam('table', tables[0]))
+        return int((await db.execute(stmt)).scalar() or 0)
+    plan = (await db.execute(Explain(select.order_by(None)))).mappings().all()
+    # 多表查询估算为各表预计行数的乘积
+    estimated = 1.0
+    for row in plan:
+        estimated *= (row['rows'] or 0) * float(row['filtered'] or 100) / 100
+    return round(estimated)
+
+
+async def _offset_paginate(
+    db: AsyncSession, select: Select, params: _CustomPageParams, count: CountMode
+) -> _CustomPage:
+    raw = params.to_raw_params()
+    total = None
+    if count == 'estimated':
+        total = await _estimated_count(db, select)
+        if total is None:
+            count = 'exact'
+    elif count == 'cached':
+        total = await _cached_count(db, select)
+    if count == 'has_more':
+        result = await db.execute(select.limit(raw.limit + 1).offset(raw.offset))
+    else:
+        result = await db.execute(select.limit(raw.limit).offset(raw.offset))
+    rows = [row[0] if len(row) == 1 else row for row in result.all()]
+    if count == 'has_more':
+        # 总条数为已知下限，存在下一页时多计一条
+        total = raw.offset + len(rows)
+        rows = rows[: raw.limit]
+    elif count == 'exact':
+        total = await _exact_count(db, select)
+    elif count == 'estimated':
+        # 估算值小于已读取的数据时，以已读取的数据为准
+        total = max(total, raw.offset + len(rows))
+    return _CustomPage.create(rows, total, params, count_mode=count)
+
+
+async def invalidate_count_cache(*tables: str) -> None:
+    """
+    清除分页总条数缓存
+
+    :param tables: 表名
+    :return:
+    """
+    await redis_client.delete(*(f'{settings.PAGING_COUNT_REDIS_PREFIX}:{table}' for table in tables))
+
+
+class _CursorPageParams(BaseModel, AbstractParams):
+    cursor: str | None = Query(None, description='Page cursor')
+    size: int = Query(20, gt=0, le=100, description='Page size')  # 默认 20 条记录
+
+    def to_raw_params(self) -> CursorRawParams:
+        return CursorRawParams(
+            cursor=self.cursor,
+            size=self.size,
+        )
+
+
+class _CursorLinks(BaseModel):
+    first: str = Field(..., description='首页链接')
+    self: str = Field(..., description='当前页链接')
+    next: str | None = Field(None, description='下一页链接')
+    prev: str | None = Field(None, description='上一页链接')
+
+
+class _CursorPageDetails(BaseModel):
+    items: list = Field([], description='当前页数据')
+    size: int = Field(..., description='每页数量')
+    next_cursor: str | None = Field(None, description='下一页游标')
+    prev_cursor: str | None = Field(None, description='上一页游标')
+    links: _CursorLinks
+
+
+class _CursorPage(_CursorPageDetails, AbstractPage[T], Generic[T]):
+    __params_type__ = _CursorPageParams
+
+    @classmethod
+    def create(
+        cls,
+        items: list,
+        params: _CursorPageParams,
+        *,
+        next_cursor: str | None = None,
+        prev_cursor: str | None = None,
+        **kwargs: Any,
+    ) -> _CursorPage[T]:
+        url = request().url
+        links = _CursorLinks(
+            first=_url_path(url.remove_query_params('cursor')),
+            self=_url_path(url),
+            next=_url_path(url.include_query_params(cursor=next_cursor)) if next_cursor else None,
+            prev=_url_path(url.include_query_params(cursor=prev_cursor)) if prev_cursor else None,
+        )
+
+        return cls(
+            items=items,
+            size=params.size,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            links=links,
+        )
+
+
+def _url_path(url) -> str:
+    return f'{url.path}?{url.query}' if url.query else url.path
+
+
+def _encode_cursor(direction: Literal['next', 'prev'], values: list[Any]) -> str:
+    return base64.urlsafe_b64encode(msgspec.json.encode([direction, values])).rstrip(b'=').decode()
+
+
+def _decode_cursor(cursor: str, keyset: Sequence[ColumnElement]) -> tuple[Literal['next', 'prev'], list[Any]]:
+    try:
+        direction, values = msgspec.json.decode(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if direction not in ('next', 'prev') or len(values) != len(keyset):
+            raise ValueError(cursor)
+        values = [
+            msgspec.convert(value, column.type.python_type, strict=False)
+            for value, column in zip(values, keyset, strict=True)
+        ]
+    except (ValueError, TypeError, binascii.Error, msgspec.MsgspecError):
+        raise errors.RequestError(msg='分页游标无效')
+    return direction, values
+
+
+async def _keyset_paginate(
+    db: AsyncSession, select: Select, params: _CursorPageParams, keyset: Sequence[ColumnElement], descending: bool
+) -> _CursorPage:
+    direction, values = _decode_cursor(params.cursor, keyset) if params.cursor else ('next', None)
+    # 向前翻页时反向排序查询，再将结果恢复为原顺序
+    reverse = descending if direction == 'next' else not descending
+    order = desc if reverse else asc
+    stmt = select.order_by(None).order_by(*(order(column) for column in keyset))
+    if values is not None:
+        row = tuple_(*keyset)
+        stmt = stmt.where(row < tuple_(*values) if reverse else row > tuple_(*values))
+    # 多查询一条用于判断是否存在更多数据
+    result = await db.execute(stmt.limit(params.size + 1))
+    rows = [row[0] if len(row) == 1 else row for row in result.all()]
+    has_more = len(rows) > params.size
+    rows = rows[: params.size]
+    if direction == 'prev':
+        rows.reverse()
+
+    def cursor_of(item: Any, to: Literal['next', 'prev']) -> str:
+        return _encode_cursor(to, [getattr(item, column.key) for column in keyset])
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if direction == 'next' and has_more or direction == 'prev':
+            next_cursor = cursor_of(rows[-1], 'next')
+        if direction == 'prev' and has_more or direction == 'next' and values is not None:
+            prev_cursor = cursor_of(rows[0], 'prev')
+    return _CursorPage.create(rows, params, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+
 class PageData(_PageDetails, Generic[SchemaT]):
     """
     包含 data schema 的统一返回模型，适用于分页接口
@@ -103,18 +328,51 @@ class PageData(_PageDetails, Generic[SchemaT]):
     items: Sequence[SchemaT]
 
 
-async def paging_data(db: AsyncSession, select: Select) -> dict:
+class CursorPageData(_CursorPageDetails, Generic[SchemaT]):
+    """包含 data schema 的统一返回模型，适用于游标分页接口，用法同 PageData"""
+
+    items: Sequence[SchemaT]
+
+
+async def paging_data(
+    db: AsyncSession,
+    select: Select,
+    *,
+    count: CountMode = 'exact',
+    keyset: Sequence[ColumnElement] | None = None,
+    descending: bool = True,
+    transformer: Callable[[Sequence], Sequence] | None = None,
+) -> dict:
     """
     基于 SQLAlchemy 创建分页数据
 
+    使用 DependsCursorPagination 时按 keyset 列进行游标分页，查询耗时与翻页深度无关，keyset 需唯一确定一行且存在索引
+
     :param db:
     :param select:
+    :param count: 总条数统计方式，cached 需在写入数据后调用 invalidate_count_cache，estimated 仅支持 MySQL，
+        其他数据库使用 exact
+    :param keyset: 游标分页排序列，例如 (User.join_time, User.id)
+    :param descending: 游标分页是否降序
+    :param transformer: 当前页数据转换函数，例如将查询结果行转换为 msgspec Struct
     :return:
     """
-    paginated_data: _CustomPage = await paginate(db, select)
+    params = resolve_params()
+    if isinstance(params, _CursorPageParams):
+        if not keyset:
+            raise ValueError('Cursor pagination requires keyset columns')
+        paginated_data = await _keyset_paginate(db, select, params, keyset, descending)
+    elif count == 'exact':
+        paginated_data: _CustomPage = await paginate(db, select)
+    else:
+        paginated_data = await _offset_paginate(db, select, params, count)
+    if transformer is not None:
+        paginated_data.items = transformer(paginated_data.items)
     page_data = paginated_data.model_dump()
     return page_data
 
 
 # 分页依赖注入
 DependsPagination = Depends(pagination_ctx(_CustomPage))
+# 游标分页依赖注入
+DependsCursorPagination = Depends(pagination_ctx(_CursorPage))
@@ -1,44 +1,41 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import time
+
 from typing import Annotated
+from uuid import uuid4
 
 from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.security.utils import get_authorization_scheme_param
-from jose import ExpiredSignatureError, JWTError, jwt
-from pwdlib import PasswordHash
-from pwdlib.hashers.bcrypt import BcryptHasher
 
 from backend.app.admin.model import User
+from backend.app.admin.schema.user import GetUserInfoDetail
+from backend.common.dataclasses import TokenPayload
 from backend.common.exception.errors import AuthorizationError, TokenError
+from backend.common.security.jwt_codec import ExpiredTokenError, InvalidTokenError, JWTCodec
+from backend.common.security.revocation import token_revocation
 from backend.core.conf import settings
-from backend.database.db import CurrentSession
+from backend.database.db import current_read_session, db_sticky_key
+from backend.database.redis import redis_client
+from backend.utils.cache import LocalCache
 
 oauth2_schema = OAuth2PasswordBearer(tokenUrl=settings.TOKEN_URL_SWAGGER)
 
-password_hash = PasswordHash((BcryptHasher(),))
-
+jwt_codec: JWTCodec = JWTCodec(
+    settings.TOKEN_ALGORITHM,
+    secret_key=settings.TOKEN_SECRET_KEY,
+    private_key=settings.TOKEN_PRIVATE_KEY,
+    public_key=settings.TOKEN_PUBLIC_KEY,
+    cache_maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    cache_ttl=settings.TOKEN_CACHE_EXPIRE_SECONDS,
+)
 
-def get_hash_password(password: str, salt: bytes | None) -> str:
-    """
-    Encrypt passwords using the hash algorithm
-
-    :param password:
-    :param salt:
-    :return:
-    """
-    return password_hash.hash(password, salt=salt)
-
-
-def password_verify(plain_password: str, hashed_password: str) -> bool:
-    """
-    Password verification
-
-    :param plain_password: The password to verify
-    :param hashed_password: The hash ciphers to compare
-    :return:
-    """
-    return password_hash.verify(plain_password, hashed_password)
+# 用户信息进程内缓存，位于 redis 缓存之前
+user_local_cache: LocalCache[int, GetUserInfoDetail] = LocalCache(
+    maxsize=settings.TOKEN_USER_LOCAL_MAXSIZE,
+    ttl=settings.TOKEN_USER_LOCAL_EXPIRE_SECONDS,
+)
 
 
 def create_access_token(sub: str) -> str:
@@ -48,8 +45,14 @@ def create_access_token(sub: str) -> str:
     :param sub: The subject/userid of the JWT
     :return:
     """
-    to_encode = {'sub': sub}
-    access_token = jwt.encode(to_encode, settings.TOKEN_SECRET_KEY, settings.TOKEN_ALGORITHM)
+    issued_at = int(time.time())
+    to_encode = {
+        'sub': sub,
+        'jti': uuid4().hex,
+        'iat': issued_at,
+        'exp': issued_at + settings.TOKEN_EXPIRE_SECONDS,
+    }
+    access_token = jwt_codec.encode(to_encode)
     return access_token
 
 
@@ -66,7 +69,7 @@ def get_token(request: Request) -> str:
     return token
 
 
-def jwt_decode(token: str) -> int:
+def jwt_decode(token: str) -> TokenPayload:
     """
     Decode token
 
@@ -74,29 +77,81 @@ def jwt_decode(token: str) -> int:
     :return:
     """
     try:
-        payload = jwt.decode(token, settings.TOKEN_SECRET_KEY, algorithms=[settings.TOKEN_ALGORITHM])
+        payload = jwt_codec.decode(token)
         user_id = int(payload.get('sub'))
-        if not user_id:
-            raise TokenError(msg='Token 无效')
-    except ExpiredSignatureError:
+        jti = payload['jti']
+        expire_time = payload['exp']
+    except ExpiredTokenError:
         raise TokenError(msg='Token 已过期')
-    except (JWTError, Exception):
+    except (InvalidTokenError, KeyError, TypeError, ValueError):
+        raise TokenError(msg='Token 无效')
+    if not user_id or not isinstance(jti, str):
         raise TokenError(msg='Token 无效')
-    return user_id
+    return TokenPayload(id=user_id, jti=jti, expire_time=expire_time)
 
 
-async def get_current_user(db: CurrentSession, token: str = Depends(oauth2_schema)) -> User:
+async def revoke_token(token: str) -> None:
     """
-    通过 token 获取当前用户
+    吊销 token
 
-    :param db:
     :param token:
     :return:
     """
-    user_id = jwt_decode(token)
-    from backend.app.admin.crud.crud_user import user_dao
+    token_payload = jwt_decode(token)
+    await token_revocation.revoke(token_payload.jti, token_payload.expire_time)
+    jwt_codec.evict(token)
+
+
+async def get_cached_user(user_id: int) -> GetUserInfoDetail | None:
+    """
+    通过两级缓存获取用户信息，依次查询进程内缓存、redis 缓存和数据库
+
+    :param user_id:
+    :return:
+    """
+    user = user_local_cache.get(user_id)
+    if user is not None:
+        return user
+    cache_key = f'{settings.TOKEN_USER_REDIS_PREFIX}:{user_id}'
+    cache_user = await redis_client.get(cache_key)
+    if cache_user:
+        user = GetUserInfoDetail.model_validate_json(cache_user)
+    else:
+        from backend.app.admin.crud.crud_user_read import user_read_dao
+
+        async with current_read_session() as db:
+            db_user = await user_read_dao.get(db, user_id)
+        if not db_user:
+            return None
+        user = GetUserInfoDetail.model_validate(db_user)
+        await redis_client.setex(cache_key, settings.TOKEN_USER_REDIS_EXPIRE_SECONDS, user.model_dump_json())
+    user_local_cache.set(user_id, user)
+    return user
+
 
-    user = await user_dao.get(db, user_id)
+async def clear_user_cache(user_id: int) -> None:
+    """
+    清除用户信息缓存，其他进程的进程内缓存将在 TOKEN_USER_LOCAL_EXPIRE_SECONDS 内失效
+
+    :param user_id:
+    :return:
+    """
+    user_local_cache.delete(user_id)
+    await redis_client.delete(f'{settings.TOKEN_USER_REDIS_PREFIX}:{user_id}')
+
+
+async def get_current_user(token: str = Depends(oauth2_schema)) -> GetUserInfoDetail:
+    """
+    通过 token 获取当前用户
+
+    :param token:
+    :return:
+    """
+    token_payload = jwt_decode(token)
+    if await token_revocation.is_revoked(token_payload.jti):
+        raise TokenError(msg='Token 已失效')
+    db_sticky_key.set(f'user:{token_payload.id}')
+    user = await get_cached_user(token_payload.id)
     if not user:
         raise TokenError(msg='Token 无效')
     if not user.status:
@@ -104,7 +159,7 @@ async def get_current_user(db: CurrentSession, token: str = Depends(oauth2_schem
     return user
 
 
-def superuser_verify(user: User):
+def superuser_verify(user: User | GetUserInfoDetail):
     """
     验证当前用户是否为超级用户
 
@@ -118,6 +173,6 @@ def superuser_verify(user: User):
 
 
 # 用户依赖注入
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[GetUserInfoDetail, Depends(get_current_user)]
 # 权限依赖注入
 DependsJwtAuth = Depends(get_current_user)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+
+from typing import Any, Literal
+
+import msgspec
+
+from backend.utils.cache import LocalCache
+
+JWTAlgorithm = Literal['HS256', 'EdDSA']
+
+
+class InvalidTokenError(Exception):
+    """Token 无效"""
+
+
+class ExpiredTokenError(InvalidTokenError):
+    """Token 已过期"""
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+
+class JWTCodec:
+    """
+    JWT 编解码器，仅支持 HS256 和 EdDSA(Ed25519)
+
+    解码成功的 payload 以 token 摘要为键缓存，缓存时间不超过 token 的 exp，相同 token 的重复请求将跳过签名校验
+    """
+
+    def __init__(
+        self,
+        algorithm: JWTAlgorithm,
+        *,
+        secret_key: str | None = None,
+        private_key: str | None = None,
+        public_key: str | None = None,
+        cache_maxsize: int = 4096,
+        cache_ttl: float = 300,
+    ) -> None:
+        """
+        初始化编解码器
+
+        :param algorithm: 签名算法
+        :param secret_key: HS256 密钥
+        :param private_key: EdDSA PEM 私钥，仅签发 token 时需要
+        :param public_key: EdDSA PEM 公钥
+        :param cache_maxsize: 已验证 token 缓存最大条目数，0 表示禁用缓存
+        :param cache_ttl: 已验证 token 缓存时间，单位：秒
+        :return:
+        """
+        self.algorithm = algorithm
+        self._header = _b64url_encode(msgspec.json.encode({'alg': algorithm, 'typ': 'JWT'}))
+        self._cache: LocalCache[bytes, dict[str, Any]] = LocalCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        if algorithm == 'HS256':
+            if not secret_key:
+                raise ValueError('HS256 requires secret_key')
+            self._secret_key = secret_key.encode()
+        elif algorithm == 'EdDSA':
+            from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+            if not public_key:
+                raise ValueError('EdDSA requires public_key')
+            self._private_key = load_pem_private_key(private_key.encode(), password=None) if private_key else None
+            self._public_key = load_pem_public_key(public_key.encode())
+        else:
+            raise ValueError(f'Unsupported algorithm: {algorithm}')
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        if self.algorithm == 'HS256':
+            return hmac.new(self._secret_key, signing_input, hashlib.sha256).digest()
+        if self._private_key is None:
+            raise ValueError('EdDSA requires private_key to sign')
+        return self._private_key.sign(signing_input)
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        if self.algorithm == 'HS256':
+            expected = hmac.new(self._secret_key, signing_input, hashlib.sha256).digest()
+            return hmac.compare_digest(expected, signature)
+        from cryptography.exceptions import InvalidSignature
+
+        try:
+            self._public_key.verify(signature, signing_input)
+        except InvalidSignature:
+            return False
+        return True
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        """
+        签发 token
+
+        :param payload:
+        :return:
+        """
+        signing_input = self._header + b'.' + _b64url_encode(msgspec.json.encode(payload))
+        return (signing_input + b'.' + _b64url_encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        校验并解析 token
+
+        :param token:
+        :return:
+        """
+        raw = token.encode()
+        digest = hashlib.sha256(raw).digest()
+        payload = self._cache.get(digest)
+        if payload is not None:
+            return payload
+
+        try:
+            signing_input, signature = raw.rsplit(b'.', 1)
+            header_segment, payload_segment = signing_input.split(b'.', 1)
+            header = msgspec.json.decode(_b64url_decode(header_segment))
+            if not isinstance(header, dict) or header.get('alg') != self.algorithm:
+                raise InvalidTokenError('Invalid algorithm')
+            if not self._verify(signing_input, _b64url_decode(signature)):
+                raise InvalidTokenError('Signature verification failed')
+            payload = msgspec.json.decode(_b64url_decode(payload_segment))
+        except (ValueError, binascii.Error, msgspec.DecodeError) as e:
+            raise InvalidTokenError(str(e)) from e
+        if not isinstance(payload, dict):
+            raise InvalidTokenError('Invalid payload')
+
+        ttl = self._cache.ttl
+        exp = payload.get('exp')
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise InvalidTokenError('Invalid exp claim')
+            remaining = exp - time.time()
+            if remaining <= 0:
+                raise ExpiredTokenError('Signature has expired')
+            ttl = min(ttl, remaining)
+        self._cache.set(digest, payload, ttl=ttl)
+        return payload
+
+    def evict(self, token: str) -> None:
+        """
+        从已验证 token 缓存中移除
+
+        :param token:
+        :return:
+        """
+        self._cache.delete(hashlib.sha256(token.encode()).digest())
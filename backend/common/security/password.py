@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from backend.common.exception import errors
+from backend.common.log import log
+from backend.common.response.response_code import StandardResponseCode
+from backend.core.conf import settings
+
+R = TypeVar('R')
+
+password_hash = PasswordHash((BcryptHasher(),))
+
+
+def get_hash_password(password: str, salt: bytes | None) -> str:
+    """
+    Encrypt passwords using the hash algorithm
+
+    :param password:
+    :param salt:
+    :return:
+    """
+    return password_hash.hash(password, salt=salt)
+
+
+def password_verify(plain_password: str, hashed_password: str) -> bool:
+    """
+    Password verification
+
+    :param plain_password: The password to verify
+    :param hashed_password: The hash ciphers to compare
+    :return:
+    """
+    return password_hash.verify(plain_password, hashed_password)
+
+
+class PasswordHashPool:
+    """
+    密码哈希进程池
+
+    bcrypt 单次计算约 100~250ms，直接在事件循环中调用会阻塞当前进程内的所有请求，因此交由独立进程执行；
+    进行中的任务超过 进程数 + 队列上限 时直接拒绝，避免请求无限堆积。批量导入使用独立的进程池，
+    按批量进程数并行计算，登录等交互请求不会排在批量任务之后
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, bulk_workers: int) -> None:
+        """
+        初始化进程池
+
+        :param max_workers: 最大进程数
+        :param max_queue: 最大排队任务数
+        :param bulk_workers: 批量任务进程数
+        :return:
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.bulk_workers = bulk_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._bulk_executor: ProcessPoolExecutor | None = None
+        self._bulk_in_flight = 0
+        self._bulk_completed = 0
+        self._bulk_failed = 0
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def start(self) -> None:
+        """启动进程池"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    async def shutdown(self) -> None:
+        """关闭进程池，取消排队中的任务，在线程中等待工作进程退出，不阻塞事件循环"""
+        executors = [executor for executor in (self._executor, self._bulk_executor) if executor is not None]
+        self._executor = self._bulk_executor = None
+        for executor in executors:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    @property
+    def saturated(self) -> bool:
+        """进程池是否已饱和"""
+        return self._in_flight >= self.max_workers + self.max_queue
+
+    async def _run(self, func: Callable[..., R], *args: Any) -> R:
+        """
+        提交任务到进程池执行
+
+        :param func:
+        :param args:
+        :return:
+        """
+        if self.saturated:
+            self._rejected += 1
+            raise errors.HTTPError(code=StandardResponseCode.HTTP_503, msg='服务繁忙，请稍后重试')
+        self.start()
+        self._in_flight += 1
+        self._submitted += 1
+        start_time = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except BrokenProcessPool as e:
+            self._failed += 1
+            # 工作进程异常退出后进程池不可再用，下次提交时重建
+            self._executor = None
+            log.error('❌ 密码哈希进程池异常 {}', e)
+            raise errors.ServerError(msg='密码处理失败，请稍后重试')
+        except Exception:
+            self._failed += 1
+            raise
+        else:
+            self._completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+            elapsed = time.perf_counter() - start_time
+            self._total_seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+
+    async def hash(self, password: str, salt: bytes | None) -> str:
+        """
+        异步密码加密
+
+        :param password:
+        :param salt:
+        :return:
+        """
+        return await self._run(get_hash_password, password, salt)
+
+    async def hash_many(self, items: list[tuple[str, bytes | None]]) -> list[str]:
+        """
+        批量异步密码加密，适用于批量导入等后台任务
+
+        在独立的批量进程池中按批量进程数并行计算，不占用交互请求的进程，也不受其排队上限限制
+
+        :param items: (密码, 盐) 列表
+        :return:
+        """
+        if not items:
+            return []
+        if self._bulk_executor is None:
+            self._bulk_executor = ProcessPoolExecutor(max_workers=self.bulk_workers)
+        loop = asyncio.get_running_loop()
+        self._bulk_in_flight += len(items)
+        try:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(self._bulk_executor, get_hash_password, *item) for item in items)
+            )
+        except BrokenProcessPool as e:
+            self._bulk_failed += len(items)
+            self._bulk_executor = None
+            log.error('❌ 批量密码哈希进程池异常 {}', e)
+            raise errors.ServerError(msg='密码处理失败，请稍后重试')
+        except Exception:
+            self._bulk_failed += len(items)
+            raise
+        else:
+            self._bulk_completed += len(items)
+            return results
+        finally:
+            self._bulk_in_flight -= len(items)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        异步密码校验
+
+        :param plain_password:
+        :param hashed_password:
+        :return:
+        """
+        return await self._run(password_verify, plain_password, hashed_password)
+
+    def metrics(self) -> dict[str, Any]:
+        """进程池指标"""
+        finished = self._completed + self._failed
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'in_flight': self._in_flight,
+            'queued': max(0, self._in_flight - self.max_workers),
+            'submitted': self._submitted,
+            'completed': self._completed,
+            'rejected': self._rejected,
+            'failed': self._failed,
+            'avg_ms': round(self._total_seconds / finished * 1000, 3) if finished else 0.0,
+            'max_ms': round(self._max_seconds * 1000, 3),
+            'bulk_workers': self.bulk_workers,
+            'bulk_in_flight': self._bulk_in_flight,
+            'bulk_completed': self._bulk_completed,
+            'bulk_failed': self._bulk_failed,
+        }
+
+
+password_hash_pool: PasswordHashPool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_POOL_SIZE,
+    max_queue=settings.PASSWORD_HASH_POOL_QUEUE_SIZE,
+    bulk_workers=settings.PASSWORD_HASH_BULK_WORKERS,
+)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from typing import Any
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+from backend.utils.bloom_filter import BloomFilter
+
+
+class TokenRevocationList:
+    """
+    Token 吊销列表
+
+    已吊销的 jti 存储于 redis 并在过期时间后自动清除；每个进程维护一个本地布隆过滤器，未命中时直接判定为未吊销，
+    仅在命中（可能误判）时查询 redis。吊销事件通过 redis 发布订阅同步到所有进程，并定期全量重建过滤器，
+    发布订阅连接异常时吊销最迟在 TOKEN_REVOKE_RESYNC_SECONDS 内生效
+    """
+
+    def __init__(self) -> None:
+        self._filter = self._new_filter()
+        self._rebuilding: BloomFilter | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._last_sync: float | None = None
+        self._redis_checks = 0
+        self._false_positives = 0
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter(settings.TOKEN_REVOKE_FILTER_CAPACITY, settings.TOKEN_REVOKE_FILTER_ERROR_RATE)
+
+    def _add_local(self, jti: str) -> None:
+        self._filter.add(jti)
+        if self._rebuilding is not None:
+            self._rebuilding.add(jti)
+
+    async def revoke(self, jti: str, expire_time: int) -> None:
+        """
+        吊销 token
+
+        :param jti: token 唯一标识
+        :param expire_time: token 过期时间戳
+        :return:
+        """
+        ttl = int(expire_time - time.time())
+        if ttl <= 0:
+            return
+        await redis_client.set(f'{settings.TOKEN_REVOKE_REDIS_PREFIX}:{jti}', 1, ex=ttl)
+        self._add_local(jti)
+        await redis_client.publish(settings.TOKEN_REVOKE_CHANNEL, jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        检查 token 是否已吊销
+
+        :param jti: token 唯一标识
+        :return:
+        """
+        if jti not in self._filter:
+            return False
+        self._redis_checks += 1
+        revoked = bool(await redis_client.exists(f'{settings.TOKEN_REVOKE_REDIS_PREFIX}:{jti}'))
+        if not revoked:
+            self._false_positives += 1
+        return revoked
+
+    async def sync(self) -> None:
+        """从 redis 全量重建本地过滤器，同时清除已过期的吊销记录"""
+        self._rebuilding = self._new_filter()
+        try:
+            async for key in redis_client.scan_iter(match=f'{settings.TOKEN_REVOKE_REDIS_PREFIX}:*', count=1000):
+                self._rebuilding.add(key.rsplit(':', 1)[-1])
+            self._filter = self._rebuilding
+            self._last_sync = time.time()
+        finally:
+            self._rebuilding = None
+
+    async def _subscribe(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(settings.TOKEN_REVOKE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self._add_local(message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error('❌ Token 吊销订阅异常 {}', e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _resync(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TOKEN_REVOKE_RESYNC_SECONDS)
+            try:
+                await self.sync()
+            except Exception as e:
+                log.error('❌ Token 吊销列表同步异常 {}', e)
+
+    async def start(self) -> None:
+        """加载吊销列表并启动同步任务"""
+        await self.sync()
+        self._tasks = [asyncio.create_task(self._subscribe()), asyncio.create_task(self._resync())]
+
+    async def stop(self) -> None:
+        """停止同步任务"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def metrics(self) -> dict[str, Any]:
+        """吊销列表指标"""
+        return {
+            'filter_items': self._filter.count,
+            'filter_capacity': self._filter.capacity,
+            'redis_checks': self._redis_checks,
+            'false_positives': self._false_positives,
+            'last_sync': self._last_sync,
+        }
+
+
+token_revocation: TokenRevocationList = TokenRevocationList()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import signal
+import threading
+import time
+
+from types import FrameType
+from typing import Any
+
+from backend.common.log import log
+
+
+class Lifecycle:
+    """
+    进程生命周期状态
+
+    启动预热完成后 ready 为 True。收到 SIGTERM 时先将 ready 置为 False 并进入 draining，服务器继续接收请求，
+    就绪检查返回 503，负载均衡摘除实例后再交给服务器的信号处理关闭；关闭时服务器（uvicorn / gunicorn 的优雅关闭）
+    先停止监听并等待进行中的请求结束，然后才执行 lifespan 关闭流程
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+        self.started_at: float | None = None
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+
+    def mark_ready(self) -> None:
+        """标记启动完成"""
+        self.ready = True
+        self.draining = False
+        self.started_at = time.monotonic()
+
+    def mark_draining(self) -> None:
+        """标记停止接收新流量，就绪检查返回 503"""
+        self.ready = False
+        self.draining = True
+
+    def install_signal_handlers(self, delay: float) -> None:
+        """
+        包装服务器的 SIGTERM 处理：收到信号时立即进入 draining，delay 秒后再执行服务器原有的处理开始关闭；
+        draining 期间再次收到信号时立即关闭。需在服务器安装信号处理之后、主线程的事件循环中调用，
+        uvicorn 在 lifespan 启动前安装
+
+        :param delay: 进入 draining 到开始关闭的时间，单位：秒，应大于负载均衡判定实例不健康所需的时间
+        :return:
+        """
+        if delay <= 0 or threading.current_thread() is not threading.main_thread():
+            return
+        previous = signal.getsignal(signal.SIGTERM)
+        if not callable(previous):
+            return
+        loop = asyncio.get_running_loop()
+
+        def handler(signum: int, frame: FrameType | None) -> None:
+            if self.draining:
+                previous(signum, frame)
+                return
+            self.mark_draining()
+            log.info('收到退出信号，{} 秒后关闭', delay)
+            loop.call_soon_threadsafe(loop.call_later, delay, previous, signum, frame)
+
+        signal.signal(signal.SIGTERM, handler)
+
+    def metrics(self) -> dict[str, Any]:
+        """生命周期指标"""
+        return {
+            'ready': self.ready,
+            'draining': self.draining,
+            'in_flight': self.in_flight,
+            'uptime_seconds': round(time.monotonic() - self.started_at, 3) if self.started_at else 0,
+        }
+
+
+lifecycle: Lifecycle = Lifecycle()
@@ -4,19 +4,26 @@ import os.path
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Depends
-from fastapi_limiter import FastAPILimiter
 from fastapi_pagination import add_pagination
 
+from backend.app.admin.service.captcha_service import captcha_service
+from backend.app.admin.service.login_time_service import login_time_service
 from backend.app.router import route
 from backend.common.exception.exception_handler import register_exception
 from backend.common.log import setup_logging, set_custom_logfile
+from backend.common.security.password import password_hash_pool
+from backend.common.security.revocation import token_revocation
+from backend.core.lifecycle import lifecycle
 from backend.core.path_conf import STATIC_DIR
+from backend.core.registry import registry
 from backend.database.redis import redis_client
 from backend.core.conf import settings
-from backend.database.db import create_table
+from backend.database.db import get_pools, pool_autosizer, slow_query_log, warm_up
+from backend.database.schema import sync_schema
 from backend.utils.demo_site import demo_site
-from backend.utils.health_check import http_limit_callback, ensure_unique_route_names
+from backend.utils.health_check import ensure_unique_route_names, health_prober, health_router
 from backend.utils.openapi import simplify_operation_ids
+from backend.utils.rate_limit import rate_limiter
 
 
 @asynccontextmanager
@@ -26,23 +33,54 @@ async def register_init(app: FastAPI):
 
     :return:
     """
-    # 创建数据库表
-    await create_table()
     # 连接 redis
     await redis_client.open()
-    # 初始化 limiter
-    await FastAPILimiter.init(
-        redis_client,
-        prefix=settings.REQUEST_LIMITER_REDIS_PREFIX,
-        http_callback=http_limit_callback,
-    )
+    await redis_client.warm_up(settings.REDIS_POOL_WARMUP)
+    # 同步数据库表结构
+    await sync_schema()
+    # 预热数据库连接池
+    await warm_up()
+    # 启动连接池容量建议
+    pool_autosizer.start(get_pools)
+    # 启动限流计数同步
+    rate_limiter.start()
+    # 启动密码哈希进程池
+    password_hash_pool.start()
+    # 加载 token 吊销列表
+    await token_revocation.start()
+    # 启动登录时间延迟写入
+    login_time_service.start()
+    # 启动验证码预生成
+    captcha_service.start()
+    # 启动依赖健康探测
+    await health_prober.start()
+    # 预热完成，开始接收流量
+    lifecycle.mark_ready()
+    # 收到 SIGTERM 后先摘除流量再关闭
+    lifecycle.install_signal_handlers(settings.SHUTDOWN_DRAIN_SECONDS)
 
     yield
 
-    # 关闭 redis 连接
-    await redis_client.close()
-    # 关闭 limiter
-    await FastAPILimiter.close()
+    # 服务器已停止监听并等待进行中的请求结束
+    lifecycle.mark_draining()
+    # 停止依赖健康探测
+    await health_prober.stop()
+    # 停止验证码预生成
+    await captcha_service.stop()
+    # 写入剩余登录时间
+    await login_time_service.stop()
+    # 停止 token 吊销列表同步
+    await token_revocation.stop()
+    # 关闭密码哈希进程池
+    await password_hash_pool.shutdown()
+    # 停止限流计数同步
+    await rate_limiter.stop()
+    # 停止连接池容量建议
+    await pool_autosizer.stop()
+    # 写入慢查询统计
+    await slow_query_log.stop()
+    # 释放当前进程的数据库引擎和 redis 连接
+    await registry.close()
 
 
 def register_app():
@@ -95,11 +133,21 @@ def register_static_file(app: FastAPI):
 
 
 def register_middleware(app) -> None:
+    # 请求工作单元，位于最内层，提交语句计入 SQL 执行计数
+    if settings.MIDDLEWARE_UNIT_OF_WORK:
+        from backend.middleware.unit_of_work_middle import UnitOfWorkMiddleware
+
+        app.add_middleware(UnitOfWorkMiddleware)
     # 接口访问日志
     if settings.MIDDLEWARE_ACCESS:
         from backend.middleware.access_middle import AccessMiddleware
 
         app.add_middleware(AccessMiddleware)
+    # SQL 执行计数
+    if settings.MIDDLEWARE_QUERY_COUNT:
+        from backend.middleware.query_count_middle import QueryCountMiddleware
+
+        app.add_middleware(QueryCountMiddleware)
     # 跨域
     if settings.MIDDLEWARE_CORS:
         from starlette.middleware.cors import CORSMiddleware
@@ -111,6 +159,10 @@ def register_middleware(app) -> None:
             allow_methods=['*'],
             allow_headers=['*'],
         )
+    # 进行中请求计数，位于最外层
+    from backend.middleware.inflight_middle import InFlightMiddleware
+
+    app.add_middleware(InFlightMiddleware)
 
 
 def register_router(app: FastAPI):
@@ -120,11 +172,16 @@ def register_router(app: FastAPI):
     :param app: FastAPI
     :return:
     """
-    dependencies = [Depends(demo_site)] if settings.DEMO_MODE else None
+    dependencies = [Depends(demo_site)] if settings.DEMO_MODE else []
+    if settings.RATE_LIMIT_RULES:
+        dependencies.append(Depends(rate_limiter))
 
     # API
     app.include_router(route, dependencies=dependencies)
 
+    # Health，供负载均衡轮询，不经过演示模式和限流
+    app.include_router(health_router)
+
     # Extra
     ensure_unique_route_names(app)
     simplify_operation_ids(app)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import inspect
+import os
+
+from typing import Any, Callable, TypeVar, cast
+
+T = TypeVar('T')
+
+
+class _LazyProxy:
+    """资源代理，每次访问时从注册表获取当前进程的实例"""
+
+    __slots__ = ('_getter',)
+
+    def __init__(self, getter: Callable[[], Any]) -> None:
+        object.__setattr__(self, '_getter', getter)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._getter(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._getter(), name, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._getter()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f'<lazy {self._getter()!r}>'
+
+
+class ResourceRegistry:
+    """
+    进程内资源注册表
+
+    数据库引擎、redis 客户端等持有套接字和连接池的资源在首次使用时创建；fork 后子进程自动丢弃继承的实例，
+    首次访问时重新创建，不会复用父进程的连接。gunicorn preload_app 时主进程只导入代码，不创建资源
+    """
+
+    def __init__(self) -> None:
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._closers: dict[str, Callable[[Any], Any]] = {}
+        self._instances: dict[str, Any] = {}
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def register(self, name: str, factory: Callable[[], T], close: Callable[[T], Any] | None = None) -> None:
+        """
+        注册资源
+
+        :param name: 资源名称
+        :param factory: 创建资源的函数
+        :param close: 关闭资源的函数，可以是协程函数
+        :return:
+        """
+        self._factories[name] = factory
+        if close is not None:
+            self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        """
+        获取资源，不存在时创建
+
+        :param name:
+        :return:
+        """
+        try:
+            return self._instances[name]
+        except KeyError:
+            instance = self._instances[name] = self._factories[name]()
+            return instance
+
+    def set(self, name: str, instance: Any) -> None:
+        """
+        替换资源实例，用于测试或自定义初始化
+
+        :param name:
+        :param instance:
+        :return:
+        """
+        self._instances[name] = instance
+
+    def lazy(self, getter: Callable[[], T]) -> T:
+        """
+        创建资源代理，模块级变量使用代理时导入不会创建资源
+
+        :param getter: 获取资源的函数，通常为 lambda: registry.get(name)
+        :return:
+        """
+        return cast('T', _LazyProxy(getter))
+
+    def reset(self) -> None:
+        """丢弃继承自父进程的实例，不关闭其连接，连接仍由父进程使用"""
+        self._instances.clear()
+
+    async def close(self) -> None:
+        """按创建的逆序关闭当前进程的资源"""
+        for name in reversed(list(self._instances)):
+            close = self._closers.get(name)
+            if close is not None:
+                result = close(self._instances[name])
+                if inspect.isawaitable(result):
+                    await result
+        self._instances.clear()
+
+
+registry: ResourceRegistry = ResourceRegistry()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re
+
+from sqlalchemy import Table, UniqueConstraint
+from sqlalchemy.exc import IntegrityError
+
+# MySQL 8.0.19 之后的错误信息中索引名带有表名前缀
+_MYSQL_DUPLICATE = re.compile(r"Duplicate entry '.*' for key '(?:[^'.]+\.)?([^'.]+)'")
+_SQLITE_UNIQUE = re.compile(r'UNIQUE constraint failed: ([\w., ]+)')
+
+
+def get_unique_violation(e: IntegrityError, table: Table) -> str | None:
+    """
+    获取违反的唯一约束或唯一索引名称
+
+    MySQL 从错误信息中解析索引名，PostgreSQL 从诊断信息中获取，SQLite 仅返回列名，按列匹配表上的唯一索引
+
+    :param e:
+    :param table:
+    :return:
+    """
+    diag = getattr(e.orig, 'diag', None)
+    if diag is not None and getattr(diag, 'constraint_name', None):
+        return diag.constraint_name
+    message = str(e.orig)
+    match = _MYSQL_DUPLICATE.search(message)
+    if match:
+        return match.group(1)
+    match = _SQLITE_UNIQUE.search(message)
+    if match:
+        columns = tuple(column.strip().rsplit('.', 1)[-1] for column in match.group(1).split(','))
+        for index in table.indexes:
+            if index.unique and tuple(column.name for column in index.columns) == columns:
+                return index.name
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and tuple(constraint.columns.keys()) == columns:
+                return constraint.name
+    return None
@@ -1,17 +1,38 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
+import itertools
 import sys
 
-from typing import Annotated
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, Literal
 from uuid import uuid4
 
 from fastapi import Depends
-from sqlalchemy import URL
+from sqlalchemy import URL, event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine, AsyncEngine
 
 from backend.common.log import log
 from backend.common.model import MappedBase
 from backend.core.conf import settings
+from backend.core.registry import registry
+from backend.database.pool import InstrumentedQueuePool, PoolAutosizer
+from backend.database.query_counter import query_counter
+from backend.database.slow_query import SlowQueryLog
+from backend.utils.cache import LocalCache
+
+# 读写分离粘滞标识，通常为当前用户，写入后同一标识的只读会话在一段时间内使用主库
+db_sticky_key: ContextVar[str | None] = ContextVar('db_sticky_key', default=None)
+
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.DATABASE_SLOW_QUERY_MS / 1000,
+    explain_rate=settings.DATABASE_SLOW_QUERY_EXPLAIN_RATE,
+    explain_interval=settings.DATABASE_SLOW_QUERY_EXPLAIN_SECONDS,
+    max_fingerprints=settings.DATABASE_SLOW_QUERY_MAX_FINGERPRINTS,
+)
 
 
 def create_async_engine_and_session(url: str | URL) -> tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
@@ -22,28 +43,293 @@ def create_async_engine_and_session(url: str | URL) -> tuple[AsyncEngine, async_
             echo=settings.DATABASE_ECHO,
             echo_pool=settings.DATABASE_POOL_ECHO,
             future=True,
-            # 中等并发
-            pool_size=10,  # 低：- 高：+
-            max_overflow=20,  # 低：- 高：+
-            pool_timeout=30,  # 低：+ 高：-
-            pool_recycle=3600,  # 低：+ 高：-
-            pool_pre_ping=True,  # 低：False 高：True
-            pool_use_lifo=False,  # 低：False 高：True
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            pool_use_lifo=settings.DATABASE_POOL_USE_LIFO,
         )
     except Exception as e:
         log.error('❌ 数据库链接失败 {}', e)
         sys.exit()
     else:
+        query_counter.instrument(engine)
+        slow_query_log.instrument(engine)
         db_session = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
         return engine, db_session
 
 
+class ReplicaRouter:
+    """
+    读写分离路由
+
+    只读会话按负载均衡策略分配到从库；在主库写入后的 sticky_seconds 内，相同 db_sticky_key 的只读会话仍使用主库，
+    以保证读到自己的写入。写入记录仅在当前进程内有效，跨进程需要负载均衡按用户保持会话
+    """
+
+    def __init__(
+        self,
+        primary: tuple[AsyncEngine, async_sessionmaker[AsyncSession]],
+        replicas: list[tuple[AsyncEngine, async_sessionmaker[AsyncSession]]],
+        *,
+        balance: Literal['round_robin', 'least_connections'] = 'round_robin',
+        sticky_seconds: float = 0,
+    ) -> None:
+        """
+        初始化读写分离路由
+
+        :param primary: 主库引擎和会话工厂
+        :param replicas: 从库引擎和会话工厂
+        :param balance: 负载均衡策略
+        :param sticky_seconds: 写入后只读会话继续使用主库的时间，单位：秒
+        :return:
+        """
+        self.primary = primary
+        self.replicas = replicas
+        self.balance = balance
+        self._cycle = itertools.cycle(replicas)
+        self._writes: LocalCache[str, bool] = LocalCache(maxsize=10000, ttl=sticky_seconds)
+        event.listen(primary[0].sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context.isinsert or context.isupdate or context.isdelete:
+            self.mark_write()
+
+    def mark_write(self) -> None:
+        """标记当前粘滞标识已写入主库"""
+        sticky_key = db_sticky_key.get()
+        if sticky_key is not None:
+            self._writes.set(sticky_key, True)
+
+    def choose(self) -> async_sessionmaker[AsyncSession]:
+        """
+        选择只读会话工厂
+
+        :return:
+        """
+        if not self.replicas:
+            return self.primary[1]
+        sticky_key = db_sticky_key.get()
+        if sticky_key is not None and self._writes.get(sticky_key):
+            return self.primary[1]
+        if self.balance == 'least_connections':
+            engine, session = min(self.replicas, key=lambda replica: getattr(replica[0].pool, 'checkedout', int)())
+            return session
+        engine, session = next(self._cycle)
+        return session
+
+
+def async_db_read_session() -> AsyncSession:
+    """只读 session，存在从库时路由到从库"""
+    return read_router.choose()()
+
+
+class UnitOfWork:
+    """
+    工作单元
+
+    同一请求内的依赖、DAO 和服务共用一个 session，首次执行 SQL 时才从连接池获取连接，由请求结束时统一提交或回滚，
+    提交成功后再执行登记的回调（如清除缓存）。只读 session 在没有从库或本单元已使用主库时复用主库 session，
+    因此每个请求最多占用主库一个连接；先读从库后写主库时分别占用主库和从库各一个连接
+    """
+
+    __slots__ = ('_session', '_read_session', '_read_on_primary', '_callbacks', 'rollback_only', 'finished')
+
+    def __init__(self) -> None:
+        self._session: AsyncSession | None = None
+        self._read_session: AsyncSession | None = None
+        self._read_on_primary = False
+        self._callbacks: list[Callable[[], Awaitable[Any]]] = []
+        self.rollback_only = False
+        self.finished = False
+
+    def session(self) -> AsyncSession:
+        """主库 session"""
+        if self._session is None:
+            if self._read_session is not None and self._read_on_primary:
+                self._session = self._read_session
+            else:
+                self._session = read_router.primary[1]()
+        return self._session
+
+    def read_session(self) -> AsyncSession:
+        """只读 session，本单元已使用主库时直接复用，以读到本请求的写入"""
+        if self._session is not None:
+            return self._session
+        if self._read_session is None:
+            factory = read_router.choose()
+            self._read_session = factory()
+            self._read_on_primary = factory is read_router.primary[1]
+        return self._read_session
+
+    async def release_read_session(self) -> None:
+        """尚未使用主库时关闭只读 session 并归还连接，之后的读取重新获取连接，用于耗时较长的请求"""
+        if self._session is None and self._read_session is not None:
+            session, self._read_session = self._read_session, None
+            await session.close()
+
+    def after_commit(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        """
+        登记提交成功后执行的回调，回滚时丢弃
+
+        :param callback:
+        :return:
+        """
+        self._callbacks.append(callback)
+
+    async def _close(self) -> None:
+        self.finished = True
+        for session in {self._session, self._read_session} - {None}:
+            await session.close()
+
+    async def commit(self) -> None:
+        """提交并释放连接，标记为仅回滚时改为回滚"""
+        if self.rollback_only:
+            log.warning('工作单元内发生过异常，已回滚')
+            await self.rollback()
+            return
+        try:
+            if self._session is not None:
+                await self._session.commit()
+        finally:
+            await self._close()
+        for callback in self._callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                log.error('❌ 工作单元提交后回调执行失败 {}', e)
+
+    async def rollback(self) -> None:
+        """回滚并释放连接"""
+        self._callbacks.clear()
+        await self._close()
+
+
+# 当前工作单元，由 UnitOfWorkMiddleware 为每个请求设置
+current_uow: ContextVar[UnitOfWork | None] = ContextVar('current_uow', default=None)
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """开启独立的工作单元，正常退出时提交，异常时回滚"""
+    uow = UnitOfWork()
+    token = current_uow.set(uow)
+    try:
+        yield uow
+    except BaseException:
+        await uow.rollback()
+        raise
+    else:
+        await uow.commit()
+    finally:
+        current_uow.reset(token)
+
+
+def _active_uow() -> UnitOfWork | None:
+    uow = current_uow.get()
+    return None if uow is None or uow.finished else uow
+
+
+@asynccontextmanager
+async def current_session() -> AsyncIterator[AsyncSession]:
+    """
+    获取主库 session
+
+    存在进行中的工作单元时加入其中，退出时仅 flush 以便在块内捕获约束冲突，块内发生异常时整个工作单元只能回滚；
+    不存在时（后台任务、脚本、响应发送后）开启独立的工作单元
+
+    :return:
+    """
+    uow = _active_uow()
+    if uow is None:
+        async with unit_of_work() as uow:
+            yield uow.session()
+        return
+    session = uow.session()
+    try:
+        yield session
+        await session.flush()
+    except BaseException:
+        uow.rollback_only = True
+        raise
+
+
+@asynccontextmanager
+async def current_read_session() -> AsyncIterator[AsyncSession]:
+    """获取只读 session，存在进行中的工作单元时加入其中，否则使用独立的只读 session"""
+    uow = _active_uow()
+    if uow is None:
+        async with async_db_read_session() as session:
+            yield session
+        return
+    yield uow.read_session()
+
+
+async def release_read_session() -> None:
+    """归还当前工作单元中只读 session 占用的连接"""
+    uow = _active_uow()
+    if uow is not None:
+        await uow.release_read_session()
+
+
+async def after_commit(callback: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    """
+    在当前工作单元提交后执行回调，不存在进行中的工作单元时立即执行
+
+    :param callback: 协程函数
+    :param args: 回调参数
+    :return:
+    """
+    uow = _active_uow()
+    if uow is None:
+        await callback(*args)
+    else:
+        uow.after_commit(partial(callback, *args))
+
+
 async def get_db():
-    """session 生成器"""
-    async with async_db_session() as session:
+    """session 生成器，加入当前请求的工作单元"""
+    async with current_session() as session:
+        yield session
+
+
+async def get_read_db():
+    """只读 session 生成器，加入当前请求的工作单元"""
+    async with current_read_session() as session:
         yield session
 
 
+def get_pools() -> dict[str, Any]:
+    """获取主库和从库的当前连接池"""
+    pools = {'primary': read_router.primary[0].pool}
+    for index, (engine, _) in enumerate(read_router.replicas):
+        pools[f'replica-{index}'] = engine.pool
+    return pools
+
+
+async def warm_up_engine(engine: AsyncEngine, size: int) -> None:
+    """
+    预先建立连接，归还后保留在连接池中
+
+    :param engine:
+    :param size: 连接数
+    :return:
+    """
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(size)))
+
+
+async def warm_up() -> None:
+    """预热主库和从库连接池"""
+    size = min(settings.DATABASE_POOL_WARMUP, settings.DATABASE_POOL_SIZE)
+    if size <= 0:
+        return
+    engines = [read_router.primary[0], *(engine for engine, _ in read_router.replicas)]
+    await asyncio.gather(*(warm_up_engine(engine, size) for engine in engines))
+
+
 async def create_table() -> None:
     """创建数据库表"""
     async with async_engine.begin() as coon:
@@ -60,6 +346,43 @@ SQLALCHEMY_DATABASE_URL = (
     f'{settings.DATABASE_PORT}/{settings.DATABASE_SCHEMA}?charset={settings.DATABASE_CHARSET}'
 )
 
-async_engine, async_db_session = create_async_engine_and_session(SQLALCHEMY_DATABASE_URL)
+
+async def _dispose_engines(engines: list[tuple[AsyncEngine, async_sessionmaker[AsyncSession]]]) -> None:
+    for engine, _ in engines:
+        await engine.dispose()
+
+
+registry.register(
+    'db.primary',
+    lambda: create_async_engine_and_session(SQLALCHEMY_DATABASE_URL),
+    close=lambda primary: _dispose_engines([primary]),
+)
+registry.register(
+    'db.replicas',
+    lambda: [create_async_engine_and_session(url) for url in settings.DATABASE_REPLICA_URLS],
+    close=_dispose_engines,
+)
+registry.register(
+    'db.read_router',
+    lambda: ReplicaRouter(
+        registry.get('db.primary'),
+        registry.get('db.replicas'),
+        balance=settings.DATABASE_REPLICA_BALANCE,
+        sticky_seconds=settings.DATABASE_REPLICA_STICKY_SECONDS,
+    ),
+)
+
+# 引擎和会话工厂在当前进程首次使用时创建
+async_engine: AsyncEngine = registry.lazy(lambda: registry.get('db.primary')[0])
+async_db_session: async_sessionmaker[AsyncSession] = registry.lazy(lambda: registry.get('db.primary')[1])
+read_router: ReplicaRouter = registry.lazy(lambda: registry.get('db.read_router'))
+pool_autosizer = PoolAutosizer(
+    settings.DATABASE_POOL_AUTOSIZE,
+    interval=settings.DATABASE_POOL_AUTOSIZE_SECONDS,
+    wait_threshold=settings.DATABASE_POOL_AUTOSIZE_WAIT_MS / 1000,
+    max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+    max_overflow_limit=settings.DATABASE_POOL_MAX_OVERFLOW_LIMIT,
+)
 # Session Annotated
 CurrentSession = Annotated[AsyncSession, Depends(get_db)]
+CurrentReadSession = Annotated[AsyncSession, Depends(get_read_db)]
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN 查询，参数与原查询使用相同的方式绑定"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable) -> None:
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f'EXPLAIN {compiler.process(element.statement, **kw)}'
+
+
+@compiles(Explain, 'sqlite')
+def _compile_explain_sqlite(element: Explain, compiler, **kw) -> str:
+    return f'EXPLAIN QUERY PLAN {compiler.process(element.statement, **kw)}'
+
+
+async def used_indexes(db: AsyncSession, statement: Executable) -> set[str]:
+    """
+    获取查询计划使用的索引，支持 MySQL 和 SQLite
+
+    :param db:
+    :param statement:
+    :return:
+    """
+    plan = (await db.execute(Explain(statement))).mappings().all()
+    if db.get_bind().dialect.name == 'sqlite':
+        return {match for row in plan for match in re.findall(r'INDEX (\w+)', row['detail'])}
+    return {row['key'] for row in plan if row.get('key')}
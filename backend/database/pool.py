@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from collections import deque
+from typing import Any, Callable, Literal
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.common.log import log
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class PoolMetrics:
+    """连接池指标，等待时间和连接存活时间保留最近的样本"""
+
+    def __init__(self, samples: int = 1000) -> None:
+        self.waits: deque[float] = deque(maxlen=samples)
+        self.lifetimes: deque[float] = deque(maxlen=samples)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.peak_checkedout = 0
+        self.peak_overflow = 0
+
+    def listen(self, pool: 'InstrumentedQueuePool') -> None:
+        """
+        注册连接池事件
+
+        :param pool:
+        :return:
+        """
+
+        @event.listens_for(pool, 'connect')
+        def connect(dbapi_connection, connection_record) -> None:
+            connection_record.info['connected_at'] = time.monotonic()
+            self.connects += 1
+
+        @event.listens_for(pool, 'checkout')
+        def checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+            # 连接池重建后事件沿用，需从连接获取当前连接池
+            current = connection_proxy._pool
+            self.checkouts += 1
+            self.peak_checkedout = max(self.peak_checkedout, current.checkedout())
+            self.peak_overflow = max(self.peak_overflow, current.overflow())
+
+        @event.listens_for(pool, 'close')
+        def close(dbapi_connection, connection_record) -> None:
+            connected_at = connection_record.info.pop('connected_at', None)
+            if connected_at is not None:
+                self.lifetimes.append(time.monotonic() - connected_at)
+            self.closes += 1
+
+        @event.listens_for(pool, 'invalidate')
+        def invalidate(dbapi_connection, connection_record, exception) -> None:
+            self.invalidations += 1
+
+    def reset_peaks(self) -> tuple[int, int]:
+        """
+        重置并返回峰值
+
+        :return: 借出连接峰值，溢出连接峰值
+        """
+        peaks = self.peak_checkedout, self.peak_overflow
+        self.peak_checkedout = self.peak_overflow = 0
+        return peaks
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """记录借出等待时间的异步连接池，等待时间包含池满时新建溢出连接的耗时"""
+
+    def __init__(self, creator, **kw) -> None:
+        super().__init__(creator, **kw)
+        self.metrics = PoolMetrics()
+        # 重建连接池时会复制事件，并由 recreate 沿用原指标
+        if '_dispatch' not in kw:
+            self.metrics.listen(self)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.waits.append(time.perf_counter() - start)
+
+    def recreate(self) -> 'InstrumentedQueuePool':
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    @property
+    def max_overflow(self) -> int:
+        return self._max_overflow
+
+    @max_overflow.setter
+    def max_overflow(self, value: int) -> None:
+        self._max_overflow = value
+
+    def stats(self) -> dict[str, Any]:
+        """连接池指标"""
+        waits = list(self.metrics.waits)
+        lifetimes = list(self.metrics.lifetimes)
+        return {
+            'size': self.size(),
+            'max_overflow': self.max_overflow,
+            'checkedin': self.checkedin(),
+            'checkedout': self.checkedout(),
+            'overflow': max(0, self.overflow()),
+            'peak_checkedout': self.metrics.peak_checkedout,
+            'peak_overflow': self.metrics.peak_overflow,
+            'checkouts': self.metrics.checkouts,
+            'timeouts': self.metrics.timeouts,
+            'connects': self.metrics.connects,
+            'closes': self.metrics.closes,
+            'invalidations': self.metrics.invalidations,
+            'wait_ms': {
+                'p50': round(percentile(waits, 0.5) * 1000, 3),
+                'p95': round(percentile(waits, 0.95) * 1000, 3),
+                'p99': round(percentile(waits, 0.99) * 1000, 3),
+                'max': round(max(waits, default=0) * 1000, 3),
+            },
+            'lifetime_seconds': {
+                'avg': round(sum(lifetimes) / len(lifetimes), 3) if lifetimes else 0,
+                'max': round(max(lifetimes, default=0), 3),
+            },
+        }
+
+
+class PoolAutosizer:
+    """
+    连接池容量建议
+
+    周期性检查各连接池最近的借出等待时间和峰值：等待时间 p95 超过阈值时建议扩大溢出连接数，
+    峰值未超过 pool_size 时建议收回扩大的溢出连接数。suggest 模式仅记录建议，adapt 模式同时调整 max_overflow；
+    pool_size 在连接池创建后不可变，仅给出建议
+    """
+
+    def __init__(
+        self,
+        mode: Literal['off', 'suggest', 'adapt'],
+        *,
+        interval: float,
+        wait_threshold: float,
+        max_overflow: int,
+        max_overflow_limit: int,
+    ) -> None:
+        """
+        初始化连接池容量建议
+
+        :param mode: 模式
+        :param interval: 检查间隔，单位：秒
+        :param wait_threshold: 借出等待时间 p95 阈值，单位：秒
+        :param max_overflow: 配置的溢出连接数，收回时不低于此值
+        :param max_overflow_limit: 溢出连接数上限
+        :return:
+        """
+        self.mode = mode
+        self.interval = interval
+        self.wait_threshold = wait_threshold
+        self.max_overflow = max_overflow
+        self.max_overflow_limit = max_overflow_limit
+        self.suggestions: dict[str, dict[str, Any]] = {}
+        self._task: asyncio.Task | None = None
+
+    def evaluate(self, name: str, pool: InstrumentedQueuePool) -> dict[str, Any] | None:
+        """
+        检查连接池并给出建议
+
+        :param name: 连接池名称
+        :param pool:
+        :return:
+        """
+        waits = list(pool.metrics.waits)
+        pool.metrics.waits.clear()
+        peak_checkedout, peak_overflow = pool.metrics.reset_peaks()
+        p95 = percentile(waits, 0.95)
+        current = pool.max_overflow
+        suggestion = None
+        if p95 > self.wait_threshold:
+            if current < self.max_overflow_limit:
+                suggestion = {'max_overflow': min(self.max_overflow_limit, max(current * 2, pool.size()))}
+            else:
+                suggestion = {'pool_size': pool.size() + current}
+        elif peak_checkedout <= pool.size() and current > self.max_overflow:
+            suggestion = {'max_overflow': max(self.max_overflow, current // 2)}
+        if suggestion is None:
+            self.suggestions.pop(name, None)
+            return None
+        suggestion.update(
+            wait_p95_ms=round(p95 * 1000, 3), peak_checkedout=peak_checkedout, peak_overflow=peak_overflow
+        )
+        self.suggestions[name] = suggestion
+        if self.mode == 'adapt' and 'max_overflow' in suggestion:
+            pool.max_overflow = suggestion['max_overflow']
+            log.info('数据库连接池 {} max_overflow 调整为 {}', name, pool.max_overflow)
+        else:
+            log.info('数据库连接池 {} 容量建议 {}', name, suggestion)
+        return suggestion
+
+    async def _run(self, get_pools: Callable[[], dict[str, Any]]) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for name, pool in get_pools().items():
+                if isinstance(pool, InstrumentedQueuePool):
+                    self.evaluate(name, pool)
+
+    def start(self, get_pools: Callable[[], dict[str, Any]]) -> None:
+        """
+        启动周期检查
+
+        :param get_pools: 返回当前连接池的函数，连接池在 dispose 后会被重建
+        :return:
+        """
+        if self._task is None and self.mode != 'off':
+            self._task = asyncio.create_task(self._run(get_pools))
+
+    async def stop(self) -> None:
+        """停止周期检查"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 每个请求执行的 SQL 数量分布区间上限
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+class QueryStats:
+    """SQL 执行统计，嵌套统计时同时累加到外层"""
+
+    __slots__ = ('count', 'seconds', 'parent')
+
+    def __init__(self, parent: 'QueryStats | None' = None) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.parent = parent
+
+    def add(self, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            stats = stats.parent
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """SQL 执行数量超出预算"""
+
+
+class QueryCounter:
+    """
+    SQL 执行计数
+
+    通过游标事件统计当前上下文中执行的 SQL 数量和耗时，并按路由记录每个请求执行数量的分布
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[str, dict[str, Any]] = {}
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        context._query_start = time.perf_counter()
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = query_stats.get()
+        if stats is not None:
+            stats.add(time.perf_counter() - context._query_start)
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """
+        注册引擎游标事件
+
+        :param engine:
+        :return:
+        """
+        event.listen(engine.sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    @contextmanager
+    def collect(self) -> Iterator[QueryStats]:
+        """
+        在当前上下文中统计 SQL 执行
+
+        :return:
+        """
+        stats = QueryStats(query_stats.get())
+        token = query_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            query_stats.reset(token)
+
+    def record(self, route: str, stats: QueryStats) -> None:
+        """
+        记录一次请求的 SQL 执行统计
+
+        :param route: 路由，格式为 '请求方法 路由路径'
+        :param stats:
+        :return:
+        """
+        data = self.routes.get(route)
+        if data is None:
+            data = self.routes[route] = {
+                'requests': 0,
+                'queries': 0,
+                'seconds': 0.0,
+                'max': 0,
+                'buckets': [0] * (len(QUERY_COUNT_BUCKETS) + 1),
+            }
+        data['requests'] += 1
+        data['queries'] += stats.count
+        data['seconds'] += stats.seconds
+        data['max'] = max(data['max'], stats.count)
+        for index, bound in enumerate(QUERY_COUNT_BUCKETS):
+            if stats.count <= bound:
+                data['buckets'][index] += 1
+                break
+        else:
+            data['buckets'][-1] += 1
+
+    def metrics(self) -> dict[str, Any]:
+        """各路由 SQL 执行数量分布"""
+        labels = [f'<={bound}' for bound in QUERY_COUNT_BUCKETS] + [f'>{QUERY_COUNT_BUCKETS[-1]}']
+        return {
+            route: {
+                'requests': data['requests'],
+                'avg_queries': round(data['queries'] / data['requests'], 3),
+                'avg_ms': round(data['seconds'] / data['requests'] * 1000, 3),
+                'max_queries': data['max'],
+                'histogram': dict(zip(labels, data['buckets'])),
+            }
+            for route, data in self.routes.items()
+        }
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    限制代码块内执行的 SQL 数量，超出时抛出 QueryBudgetExceeded，用于测试中声明接口的查询预算::
+
+        with query_budget(3):
+            await client.get('/api/v1/users')
+
+    :param max_queries: 最大 SQL 执行数量
+    :return:
+    """
+    with query_counter.collect() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(f'执行了 {stats.count} 条 SQL，超出预算 {max_queries} 条')
+
+
+query_counter: QueryCounter = QueryCounter()
@@ -7,6 +7,7 @@ from redis.exceptions import AuthenticationError, TimeoutError
 
 from backend.common.log import log
 from backend.core.conf import settings
+from backend.core.registry import registry
 
 
 class RedisCli(Redis):
@@ -38,6 +39,21 @@ class RedisCli(Redis):
             log.error('❌ 数据库 redis 连接异常 {}', e)
             sys.exit()
 
+    async def warm_up(self, size: int) -> None:
+        """
+        预先建立连接，归还后保留在连接池中
+
+        :param size: 连接数
+        :return:
+        """
+        connections = []
+        try:
+            for _ in range(size):
+                connections.append(await self.connection_pool.get_connection('PING'))
+        finally:
+            for connection in connections:
+                await self.connection_pool.release(connection)
+
     async def delete_prefix(self, prefix: str, exclude: str | list = None):
         """
         删除指定前缀的所有key
@@ -60,5 +76,7 @@ class RedisCli(Redis):
             await self.delete(*keys)
 
 
-# 创建 redis 客户端单例
-redis_client: RedisCli = RedisCli()
+registry.register('redis', RedisCli, close=lambda client: client.aclose())
+
+# redis 客户端在当前进程首次使用时创建
+redis_client: RedisCli = registry.lazy(lambda: registry.get('redis'))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from backend.common.log import log
+from backend.common.model import MappedBase
+from backend.core.conf import settings
+from backend.database.db import async_engine, create_table
+from backend.database.redis import redis_client
+from backend.utils.timezone import timezone
+
+# 结构标记表不属于业务模型，不参与 create_all 和 alembic 自动生成
+schema_marker = Table(
+    'sys_schema_marker',
+    MetaData(),
+    Column('id', Integer, primary_key=True, autoincrement=False),
+    Column('fingerprint', String(64), nullable=False, comment='表结构指纹'),
+    Column('updated_time', DateTime, nullable=False, comment='更新时间'),
+)
+
+
+def schema_fingerprint(dialect: Dialect) -> str:
+    """
+    表结构指纹，为当前数据库方言下所有表及索引 DDL 的 sha256
+
+    :param dialect:
+    :return:
+    """
+    digest = hashlib.sha256()
+    for table in sorted(MappedBase.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ''):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+async def _read_marker() -> str | None:
+    try:
+        async with async_engine.connect() as conn:
+            return await conn.scalar(select(schema_marker.c.fingerprint).where(schema_marker.c.id == 1))
+    except DBAPIError:
+        # 标记表尚未创建
+        return None
+
+
+async def _write_marker(fingerprint: str) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(schema_marker.create, checkfirst=True)
+        values = {'fingerprint': fingerprint, 'updated_time': timezone.now()}
+        result = await conn.execute(schema_marker.update().where(schema_marker.c.id == 1).values(**values))
+        if result.rowcount == 0:
+            await conn.execute(schema_marker.insert().values(id=1, **values))
+
+
+async def sync_schema() -> None:
+    """
+    启动时同步表结构
+
+    fingerprint 模式下仅在数据库中记录的表结构指纹与当前模型不一致时执行 create_all，
+    并使用 redis 锁保证多个进程同时启动时只有一个进程执行，其他进程等待后重新检查指纹；
+    always 模式每次启动都执行 create_all，off 模式不执行，由 alembic 迁移管理表结构
+    """
+    if settings.DATABASE_SCHEMA_SYNC == 'off':
+        return
+    if settings.DATABASE_SCHEMA_SYNC == 'always':
+        await create_table()
+        return
+    fingerprint = schema_fingerprint(async_engine.dialect)
+    if await _read_marker() == fingerprint:
+        return
+    lock = redis_client.lock(
+        f'{settings.DATABASE_SCHEMA_REDIS_PREFIX}:lock',
+        timeout=settings.DATABASE_SCHEMA_LOCK_SECONDS,
+        blocking_timeout=settings.DATABASE_SCHEMA_LOCK_SECONDS,
+    )
+    async with lock:
+        if await _read_marker() == fingerprint:
+            return
+        await create_table()
+        await _write_marker(fingerprint)
+    log.info('数据库表结构已同步，指纹 {}', fingerprint)
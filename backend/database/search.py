@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from sqlalchemy import Boolean
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+
+# MySQL ngram 全文解析器默认分词长度，短于此长度的关键词无法通过全文索引匹配
+NGRAM_TOKEN_SIZE = 2
+
+
+class FulltextContains(ColumnElement[bool]):
+    """
+    子串匹配条件
+
+    MySQL 使用 ngram 全文索引的短语匹配 MATCH ... AGAINST ('"x"' IN BOOLEAN MODE)，
+    其他数据库及过短的关键词使用 LIKE '%x%'；全文索引需在创建时关闭停用词，否则包含停用词字母的分词不会被索引
+    """
+
+    type = Boolean()
+    inherit_cache = False
+
+    def __init__(self, column: ColumnElement, term: str) -> None:
+        self.column = column
+        self.term = term
+
+    def self_group(self, against=None) -> 'FulltextContains':
+        # 已是完整的条件表达式，避免在 AND/OR 中被包装为 = 1
+        return self
+
+
+def _escape_like(term: str) -> str:
+    return term.replace('/', '//').replace('%', '/%').replace('_', '/_')
+
+
+def prefix_match(column: ColumnElement, term: str) -> ColumnElement[bool]:
+    """
+    前缀匹配条件，LIKE 'x%' 可以使用列上的 B-Tree 索引
+
+    :param column:
+    :param term: 关键词
+    :return:
+    """
+    return column.like(f'{_escape_like(term)}%', escape='/')
+
+
+def suffix_match(column: ColumnElement, term: str) -> ColumnElement[bool]:
+    """
+    后缀匹配条件，无法使用索引，需要索引时对倒序存储的列使用 prefix_match
+
+    :param column:
+    :param term: 关键词
+    :return:
+    """
+    return column.like(f'%{_escape_like(term)}', escape='/')
+
+
+def fulltext_contains(column: ColumnElement, term: str) -> FulltextContains:
+    """
+    子串匹配条件
+
+    :param column: 存在 ngram 全文索引的列
+    :param term: 关键词
+    :return:
+    """
+    return FulltextContains(column, term)
+
+
+@compiles(FulltextContains)
+def _compile_like(element: FulltextContains, compiler, **kw) -> str:
+    return compiler.process(element.column.like(f'%{_escape_like(element.term)}%', escape='/'), **kw)
+
+
+@compiles(FulltextContains, 'mysql')
+def _compile_match(element: FulltextContains, compiler, **kw) -> str:
+    term = element.term.replace('"', '')
+    if len(term) < NGRAM_TOKEN_SIZE:
+        return _compile_like(element, compiler, **kw)
+    return compiler.process(element.column.match(f'"{term}"'), **kw)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+import re
+import time
+
+from collections import deque
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.common.log import log
+from backend.database.pool import percentile
+from backend.database.query_counter import query_stats
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|:\w+|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'(\(\?[^()]*\))(?:\s*,\s*\(\?[^()]*\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+# 慢查询日志标记，用于写入独立的日志文件
+slow_log = log.bind(slow_query=True)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    SQL 指纹，将字面量和绑定参数替换为 ?，并合并 IN 列表和多行 VALUES
+
+    :param statement:
+    :return:
+    """
+    statement = _STRING.sub('?', statement)
+    statement = _PLACEHOLDER.sub('?', statement)
+    statement = _NUMBER.sub('?', statement)
+    statement = _IN_LIST.sub('IN (?+)', statement)
+    statement = _VALUES_LIST.sub(r'\1, ...', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+class _FingerprintStats:
+    __slots__ = ('count', 'slow', 'seconds', 'max', 'samples', 'explain', 'explained_at')
+
+    def __init__(self, samples: int) -> None:
+        self.count = 0
+        self.slow = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=samples)
+        self.explain: list[dict[str, Any]] | None = None
+        self.explained_at = 0.0
+
+
+class SlowQueryLog:
+    """
+    慢查询日志
+
+    按 SQL 指纹统计所有语句的耗时，超过阈值的语句写入慢查询日志，并按采样率在后台使用独立连接获取查询计划；
+    同一指纹在 explain_interval 内最多获取一次查询计划
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float,
+        explain_rate: float,
+        explain_interval: float,
+        max_fingerprints: int,
+        samples: int = 256,
+    ) -> None:
+        """
+        初始化慢查询日志
+
+        :param threshold: 慢查询阈值，单位：秒
+        :param explain_rate: 慢查询获取查询计划的采样率
+        :param explain_interval: 同一指纹获取查询计划的最小间隔，单位：秒
+        :param max_fingerprints: 统计的指纹数量上限，超出后新指纹不再统计
+        :param samples: 每个指纹保留的耗时样本数
+        :return:
+        """
+        self.threshold = threshold
+        self.explain_rate = explain_rate
+        self.explain_interval = explain_interval
+        self.max_fingerprints = max_fingerprints
+        self.samples = samples
+        self.stats: dict[str, _FingerprintStats] = {}
+        self.dropped = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """
+        注册引擎游标事件
+
+        :param engine:
+        :return:
+        """
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+            context._slow_query_start = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+            elapsed = time.perf_counter() - context._slow_query_start
+            self.record(engine, statement, parameters, elapsed, explainable=not executemany)
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
+
+    def record(self, engine: AsyncEngine, statement: str, parameters: Any, elapsed: float, explainable: bool) -> None:
+        """
+        记录一次语句执行
+
+        :param engine:
+        :param statement:
+        :param parameters:
+        :param elapsed: 耗时，单位：秒
+        :param explainable: 是否可以获取查询计划
+        :return:
+        """
+        if statement.startswith('EXPLAIN'):
+            return
+        key = fingerprint(statement)
+        stats = self.stats.get(key)
+        if stats is None:
+            if len(self.stats) >= self.max_fingerprints:
+                self.dropped += 1
+                return
+            stats = self.stats[key] = _FingerprintStats(self.samples)
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.max = max(stats.max, elapsed)
+        stats.samples.append(elapsed)
+        if elapsed < self.threshold:
+            return
+        stats.slow += 1
+        slow_log.warning('慢查询 {:.3f}ms | {}', elapsed * 1000, key)
+        now = time.monotonic()
+        if (
+            explainable
+            and statement.lstrip()[:6].upper() == 'SELECT'
+            and now - stats.explained_at >= self.explain_interval
+            and random.random() < self.explain_rate
+        ):
+            stats.explained_at = now
+            task = asyncio.get_running_loop().create_task(self._explain(engine, key, statement, parameters))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, key: str, statement: str, parameters: Any) -> None:
+        # 后台任务复制了请求上下文，查询计划不计入请求的 SQL 执行数量
+        query_stats.set(None)
+        prefix = 'EXPLAIN QUERY PLAN' if engine.dialect.name == 'sqlite' else 'EXPLAIN'
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f'{prefix} {statement}', parameters)
+                plan = [dict(row) for row in result.mappings()]
+        except Exception as e:
+            log.warning('慢查询获取查询计划失败 {}', e)
+            return
+        stats = self.stats.get(key)
+        if stats is not None:
+            stats.explain = plan
+        slow_log.warning('慢查询计划 | {} | {}', key, plan)
+
+    def metrics(self, top: int = 50) -> dict[str, Any]:
+        """
+        按总耗时排序的指纹统计
+
+        :param top: 返回的指纹数量
+        :return:
+        """
+        items = sorted(self.stats.items(), key=lambda item: item[1].seconds, reverse=True)[:top]
+        fingerprints = []
+        for key, stats in items:
+            samples = list(stats.samples)
+            fingerprints.append({
+                'fingerprint': key,
+                'count': stats.count,
+                'slow': stats.slow,
+                'total_ms': round(stats.seconds * 1000, 3),
+                'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+                'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+                'max_ms': round(stats.max * 1000, 3),
+                'explain': stats.explain,
+            })
+        return {
+            'threshold_ms': self.threshold * 1000,
+            'tracked': len(self.stats),
+            'dropped': self.dropped,
+            'fingerprints': fingerprints,
+        }
+
+    def dump(self, top: int = 50) -> None:
+        """
+        将指纹统计写入慢查询日志
+
+        :param top: 写入的指纹数量
+        :return:
+        """
+        for item in self.metrics(top)['fingerprints']:
+            if item['slow']:
+                slow_log.warning(
+                    '慢查询统计 | count={} slow={} p50={}ms p99={}ms max={}ms | {}',
+                    item['count'],
+                    item['slow'],
+                    item['p50_ms'],
+                    item['p99_ms'],
+                    item['max_ms'],
+                    item['fingerprint'],
+                )
+
+    async def stop(self) -> None:
+        """等待进行中的查询计划获取并写入统计"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.dump()
@@ -2,14 +2,14 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
 
-import uvicorn
-
 from backend.core.registrar import register_app
 
 app = register_app()
 
 
 if __name__ == '__main__':
+    import uvicorn
+
     try:
         config = uvicorn.Config(app=f'{Path(__file__).stem}:app', reload=True)
         server = uvicorn.Server(config)
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.core.lifecycle import lifecycle
+
+
+class InFlightMiddleware:
+    """
+    进行中请求计数中间件
+
+    使用纯 ASGI 实现，计数覆盖到响应体发送完成，包括流式响应；通过生命周期指标查看
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        lifecycle.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lifecycle.request_finished()
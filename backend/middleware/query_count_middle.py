@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.query_counter import query_counter
+
+
+class QueryCountMiddleware(BaseHTTPMiddleware):
+    """
+    SQL 执行计数中间件
+
+    按路由记录每个请求执行的 SQL 数量，开发环境在响应头中返回；流式响应在发送响应体期间执行的 SQL 不计入
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        with query_counter.collect() as stats:
+            response = await call_next(request)
+        route = request.scope.get('route')
+        if route is not None:
+            rule = f'{request.method} {route.path}'
+            query_counter.record(rule, stats)
+            budget = settings.DATABASE_QUERY_BUDGETS.get(rule)
+            if budget is not None and stats.count > budget:
+                log.warning('{} 执行了 {} 条 SQL，超出预算 {} 条', rule, stats.count, budget)
+        if settings.ENVIRONMENT == 'dev':
+            response.headers['X-DB-Query-Count'] = str(stats.count)
+            response.headers['X-DB-Query-Time'] = f'{stats.seconds * 1000:.3f}ms'
+        return response
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.database.db import UnitOfWork, current_uow
+
+
+class UnitOfWorkMiddleware:
+    """
+    请求工作单元中间件
+
+    为每个请求设置工作单元，在发送响应头之前按状态码提交或回滚并释放连接，提交失败时返回 500 而不是成功响应；
+    流式响应体和后台任务在工作单元结束后执行，使用独立的 session
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        uow = UnitOfWork()
+        token = current_uow.set(uow)
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start' and not uow.finished:
+                if message['status'] < 400:
+                    await uow.commit()
+                else:
+                    await uow.rollback()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not uow.finished:
+                await uow.rollback()
+            current_uow.reset(token)
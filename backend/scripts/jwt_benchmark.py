@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JWT 解码微基准测试，对比 python-jose 与 JWTCodec（冷/热缓存）的单次解码耗时
+
+在项目根目录执行::
+
+    python -m backend.scripts.jwt_benchmark -n 20000
+"""
+
+import argparse
+import secrets
+import timeit
+
+from backend.common.security.jwt_codec import JWTCodec
+
+
+def _report(name: str, seconds: float, number: int, baseline: float | None = None) -> None:
+    per_call = seconds / number * 1_000_000
+    speedup = f'{baseline / seconds:>6.1f}x' if baseline else '     -'
+    print(f'{name:<28} {per_call:>10.2f} µs/op {speedup}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--number', type=int, default=20000, help='每项测试的循环次数')
+    args = parser.parse_args()
+
+    secret_key = secrets.token_urlsafe(32)
+    payload = {'sub': '1'}
+    cold = JWTCodec('HS256', secret_key=secret_key, cache_maxsize=0)
+    warm = JWTCodec('HS256', secret_key=secret_key)
+    token = cold.encode(payload)
+    assert warm.decode(token) == payload
+
+    baseline = None
+    try:
+        from jose import jwt
+    except ImportError:
+        print('python-jose 未安装，跳过基线测试')
+    else:
+        assert jwt.decode(token, secret_key, algorithms=['HS256']) == payload
+        baseline = timeit.timeit(lambda: jwt.decode(token, secret_key, algorithms=['HS256']), number=args.number)
+        _report('python-jose jwt.decode', baseline, args.number)
+
+    _report(
+        'JWTCodec.decode (cold)', timeit.timeit(lambda: cold.decode(token), number=args.number), args.number, baseline
+    )
+    _report(
+        'JWTCodec.decode (cached)', timeit.timeit(lambda: warm.decode(token), number=args.number), args.number, baseline
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时报告：统计导入耗时最多的模块和包，并检查从解释器启动到处理完第一个请求的耗时是否超出预算，
+超出时退出码为 1；冷启动回归检查见 tests/test_startup.py，本脚本用于定位耗时
+
+第一个请求不经过 lifespan，不连接数据库和 redis，仅包含导入、创建应用和构建中间件栈的耗时
+
+在项目根目录执行::
+
+    python -m backend.scripts.startup_profile --budget 3 --top 20
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from collections import defaultdict
+
+from backend.core.path_conf import BASE_PATH
+
+# 子进程中导入应用并通过 ASGI 直接发送一个请求
+PROBE = """
+import asyncio, json, time
+start = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+
+async def probe():
+    messages = []
+    requested = False
+    finished = asyncio.Event()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': '/__startup_probe__', 'raw_path': b'/__startup_probe__', 'root_path': '', 'query_string': b'',
+        'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if message['type'] == 'http.response.body' and not message.get('more_body'):
+            finished.set()
+
+    await app(scope, receive, send)
+    return messages[0]['status']
+
+status = asyncio.run(probe())
+done = time.perf_counter()
+print(json.dumps({'import': imported - start, 'first_request': done - imported, 'status': status}))
+"""
+
+
+def run_probe(importtime: bool = False) -> tuple[float, dict, str]:
+    """
+    在新的解释器中启动应用
+
+    :param importtime: 是否开启 -X importtime
+    :return: 总耗时，子进程耗时明细，标准错误输出
+    """
+    args = [sys.executable, *(['-X', 'importtime'] if importtime else []), '-c', PROBE]
+    start = time.perf_counter()
+    result = subprocess.run(args, capture_output=True, text=True, check=False, cwd=BASE_PATH.parent)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f'启动失败，退出码 {result.returncode}')
+    return elapsed, json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr: str) -> tuple[list[tuple[str, int, int]], dict[str, int]]:
+    """
+    解析 -X importtime 输出
+
+    :param stderr:
+    :return: 模块 (名称, 自身耗时, 累计耗时) 列表，顶层包自身耗时合计，单位：微秒
+    """
+    modules = []
+    packages: defaultdict[str, int] = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:') :].split('|')
+        name = name.strip()
+        modules.append((name, int(self_us), int(cumulative_us)))
+        packages[name.split('.')[0]] += int(self_us)
+    return modules, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='启动耗时报告')
+    parser.add_argument('--budget', type=float, default=3.0, help='冷启动到第一个请求的耗时预算，单位：秒')
+    parser.add_argument('--runs', type=int, default=3, help='计时运行次数，取中位数')
+    parser.add_argument('--top', type=int, default=20, help='报告中列出的模块和包数量')
+    args = parser.parse_args()
+
+    _, _, stderr = run_probe(importtime=True)
+    modules, packages = parse_importtime(stderr)
+    print(f'累计导入耗时最多的模块（前 {args.top} 个）：')
+    for name, _, cumulative_us in sorted(modules, key=lambda m: m[2], reverse=True)[: args.top]:
+        print(f'  {cumulative_us / 1000:>9.1f}ms  {name}')
+    print(f'自身导入耗时最多的顶层包（前 {args.top} 个）：')
+    for name, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[: args.top]:
+        print(f'  {self_us / 1000:>9.1f}ms  {name}')
+
+    runs = [run_probe() for _ in range(args.runs)]
+    total = statistics.median(elapsed for elapsed, _, _ in runs)
+    imported = statistics.median(detail['import'] for _, detail, _ in runs)
+    first_request = statistics.median(detail['first_request'] for _, detail, _ in runs)
+    print(
+        f'冷启动到第一个请求：{total:.3f}s（导入应用 {imported:.3f}s，第一个请求 {first_request:.3f}s），'
+        f'预算 {args.budget:.3f}s'
+    )
+    if total > args.budget:
+        print('FAIL  冷启动耗时超出预算')
+        sys.exit(1)
+    print('OK    冷启动耗时在预算内')
+
+
+if __name__ == '__main__':
+    main()
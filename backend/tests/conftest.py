@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+# 测试不依赖本地 .env，环境变量优先于 .env 中的配置
+os.environ.setdefault('ENVIRONMENT', 'dev')
+os.environ.setdefault('DATABASE_HOST', '127.0.0.1')
+os.environ.setdefault('DATABASE_PORT', '3306')
+os.environ.setdefault('DATABASE_USER', 'root')
+os.environ.setdefault('DATABASE_PASSWORD', '123456')
+os.environ.setdefault('REDIS_HOST', '127.0.0.1')
+os.environ.setdefault('REDIS_PORT', '6379')
+os.environ.setdefault('REDIS_PASSWORD', '')
+os.environ.setdefault('REDIS_DATABASE', '0')
+os.environ.setdefault('TOKEN_SECRET_KEY', 'test-secret-key')
+
+
+@pytest.fixture
+def app(tmp_path):
+    """使用 SQLite 和 fakeredis 的应用，不执行 lifespan"""
+    from fakeredis.aioredis import FakeRedis
+
+    from backend.core.registry import registry
+    from backend.database.db import create_async_engine_and_session
+    from backend.database.redis import redis_client
+    from backend.main import app
+
+    registry.set('db.primary', create_async_engine_and_session(f'sqlite+aiosqlite:///{tmp_path / "test.db"}'))
+    registry.set('db.replicas', [])
+    redis_client.connection_pool = FakeRedis(decode_responses=True).connection_pool
+    yield app
+    registry.reset()
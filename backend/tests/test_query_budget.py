@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+import httpx
+import pytest
+
+from sqlalchemy import insert
+
+from backend.app.admin.model import User
+from backend.common.security.jwt import create_access_token
+from backend.core.conf import settings
+from backend.database.db import async_engine, create_table, uuid4_str
+from backend.database.query_counter import QueryBudgetExceeded, query_budget
+from backend.utils.timezone import timezone
+
+
+async def _login() -> dict[str, str]:
+    await create_table()
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
+            insert(User).values(
+                uuid=uuid4_str(),
+                username='admin',
+                password='',
+                email='admin@example.com',
+                status=1,
+                is_superuser=True,
+                join_time=timezone.now(),
+            )
+        )
+    return {'Authorization': f'Bearer {create_access_token(str(result.inserted_primary_key[0]))}'}
+
+
+def test_get_all_users_query_budget(app):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            headers = await _login()
+            url = f'{settings.FASTAPI_API_V1_PATH}/users'
+            # 首次请求：当前用户、总数和分页查询
+            with query_budget(3):
+                response = await client.get(url, headers=headers)
+            assert response.status_code == 200
+            # 当前用户和总数已缓存，仅执行分页查询
+            with query_budget(1):
+                await client.get(url, headers=headers)
+            with pytest.raises(QueryBudgetExceeded):
+                with query_budget(0):
+                    await client.get(url, headers=headers)
+        await async_engine.dispose()
+
+    asyncio.run(main())
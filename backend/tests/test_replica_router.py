@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from sqlalchemy import column, insert, select, table, text
+
+from backend.database.db import ReplicaRouter, create_async_engine_and_session, db_sticky_key
+
+node = table('node', column('name'))
+
+
+async def _create_database(path, name: str):
+    engine, session = create_async_engine_and_session(f'sqlite+aiosqlite:///{path}')
+    async with engine.begin() as conn:
+        await conn.execute(text('CREATE TABLE node (name VARCHAR(16))'))
+        await conn.execute(insert(node).values(name=name))
+    return engine, session
+
+
+async def _node(router: ReplicaRouter) -> str:
+    async with router.choose()() as session:
+        return await session.scalar(select(node.c.name).limit(1))
+
+
+async def _router(tmp_path, **kwargs) -> ReplicaRouter:
+    primary = await _create_database(tmp_path / 'primary.db', 'primary')
+    replicas = [await _create_database(tmp_path / f'replica-{i}.db', f'replica-{i}') for i in range(2)]
+    return ReplicaRouter(primary, replicas, **kwargs)
+
+
+async def _dispose(router: ReplicaRouter) -> None:
+    for engine, _ in [router.primary, *router.replicas]:
+        await engine.dispose()
+
+
+def test_round_robin(tmp_path):
+    async def main():
+        router = await _router(tmp_path)
+        try:
+            return [await _node(router) for _ in range(4)]
+        finally:
+            await _dispose(router)
+
+    assert asyncio.run(main()) == ['replica-0', 'replica-1', 'replica-0', 'replica-1']
+
+
+def test_least_connections(tmp_path):
+    async def main():
+        router = await _router(tmp_path, balance='least_connections')
+        try:
+            # replica-0 占用一个连接时路由到 replica-1
+            async with router.replicas[0][0].connect():
+                busy = [await _node(router) for _ in range(2)]
+            idle = await _node(router)
+            return busy, idle
+        finally:
+            await _dispose(router)
+
+    busy, idle = asyncio.run(main())
+    assert busy == ['replica-1', 'replica-1']
+    assert idle == 'replica-0'
+
+
+def test_without_replicas_uses_primary(tmp_path):
+    async def main():
+        primary = await _create_database(tmp_path / 'primary.db', 'primary')
+        router = ReplicaRouter(primary, [])
+        try:
+            return await _node(router)
+        finally:
+            await _dispose(router)
+
+    assert asyncio.run(main()) == 'primary'
+
+
+@pytest.mark.parametrize('sticky_key', ['user:1', None])
+def test_read_your_writes(tmp_path, sticky_key):
+    async def main():
+        router = await _router(tmp_path, sticky_seconds=0.5)
+        token = db_sticky_key.set(sticky_key)
+        try:
+            async with router.primary[1].begin() as session:
+                await session.execute(insert(node).values(name='written'))
+            after_write = await _node(router)
+            other = db_sticky_key.set('user:2')
+            other_user = await _node(router)
+            db_sticky_key.reset(other)
+            await asyncio.sleep(0.6)
+            expired = await _node(router)
+            return after_write, other_user, expired
+        finally:
+            db_sticky_key.reset(token)
+            await _dispose(router)
+
+    after_write, other_user, expired = asyncio.run(main())
+    if sticky_key is None:
+        # 没有粘滞标识时写入不影响只读路由
+        assert after_write.startswith('replica-')
+    else:
+        assert after_write == 'primary'
+    assert other_user.startswith('replica-')
+    assert expired.startswith('replica-')
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+
+from backend.scripts.startup_profile import run_probe
+
+# 冷启动到处理完第一个请求的耗时预算，单位：秒，可通过环境变量按运行环境调整
+STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', 3))
+
+
+def test_cold_start_within_budget():
+    elapsed, detail, _ = run_probe()
+    assert detail['status'] == 404
+    assert elapsed <= STARTUP_BUDGET_SECONDS, (
+        f'冷启动到第一个请求耗时 {elapsed:.3f}s（导入应用 {detail["import"]:.3f}s，'
+        f'第一个请求 {detail["first_request"]:.3f}s），超出预算 {STARTUP_BUDGET_SECONDS:.3f}s，'
+        '可执行 python -m backend.scripts.startup_profile 定位耗时'
+    )
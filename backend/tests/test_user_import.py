@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+import bcrypt
+import httpx
+
+from sqlalchemy import insert, select
+
+from backend.app.admin.model import User
+from backend.common.security.jwt import create_access_token
+from backend.common.security.password import password_hash_pool
+from backend.core.conf import settings
+from backend.database.db import async_engine, create_table, uuid4_str
+from backend.utils.timezone import timezone
+
+CSV = (
+    'username,password,email\n'
+    'alice,"pa,ss",alice@example.com\n'
+    'bob,"first\n'
+    'second",bob@example.com\n'
+    'carol,secret,not-an-email\n'
+)
+
+
+async def _login() -> dict[str, str]:
+    await create_table()
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
+            insert(User).values(
+                uuid=uuid4_str(),
+                username='admin',
+                password='',
+                email='admin@example.com',
+                status=1,
+                is_superuser=True,
+                join_time=timezone.now(),
+            )
+        )
+    return {'Authorization': f'Bearer {create_access_token(str(result.inserted_primary_key[0]))}'}
+
+
+def test_import_csv_quoted_fields(app):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            headers = {**await _login(), 'Content-Type': 'text/csv'}
+            response = await client.post(
+                f'{settings.FASTAPI_API_V1_PATH}/users/import', headers=headers, content=CSV.encode()
+            )
+        assert response.status_code == 200
+        data = response.json()['data']
+        assert (data['total'], data['created'], data['failed']) == (3, 2, 1)
+        # 多行记录之后的行号仍按文件中的物理行计算
+        assert [(error['line'], error['username']) for error in data['errors']] == [(5, 'carol')]
+        async with async_engine.connect() as conn:
+            rows = dict((await conn.execute(select(User.username, User.password))).all())
+        assert bcrypt.checkpw(b'pa,ss', rows['alice'].encode())
+        assert bcrypt.checkpw(b'first\nsecond', rows['bob'].encode())
+        await password_hash_pool.shutdown()
+        await async_engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from sqlalchemy import insert, inspect, text
+from sqlalchemy.dialects import mysql
+
+from backend.app.admin.crud.crud_user import user_dao
+from backend.app.admin.model import User
+from backend.common.enums import SearchMatchType
+from backend.common.model import MappedBase
+from backend.database.db import SQLALCHEMY_DATABASE_URL, create_async_engine_and_session, uuid4_str
+from backend.database.explain import used_indexes
+from backend.utils.timezone import timezone
+
+# (get_list 参数, 预期索引, 是否仅 MySQL)
+INDEX_CHECKS = [
+    ({'username': 'adm', 'username_match': SearchMatchType.prefix}, 'ix_sys_user_username', False),
+    ({'phone': '138', 'phone_match': SearchMatchType.prefix}, 'ix_sys_user_phone', False),
+    ({'phone': '1234', 'phone_match': SearchMatchType.suffix}, 'ix_sys_user_phone_reverse', False),
+    ({'username': 'dmi', 'username_match': SearchMatchType.contains}, 'ft_sys_user_username', True),
+    ({'phone': '0001', 'phone_match': SearchMatchType.contains}, 'ft_sys_user_phone', True),
+]
+USERS = [('admin', '13800001234'), ('sadmin', '13912345678'), ('bob', None)]
+
+
+async def _sqlite_session(tmp_path):
+    engine, session = create_async_engine_and_session(f'sqlite+aiosqlite:///{tmp_path / "search.db"}')
+    async with engine.begin() as conn:
+        await conn.run_sync(MappedBase.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    'uuid': uuid4_str(),
+                    'username': username,
+                    'password': '',
+                    'email': f'{username}@example.com',
+                    'phone': phone,
+                    'phone_reverse': phone[::-1] if phone else None,
+                    'join_time': timezone.now(),
+                }
+                for username, phone in USERS
+            ],
+        )
+    return engine, session
+
+
+@pytest.mark.parametrize(
+    ('kwargs', 'expected'),
+    [
+        ({'username': 'adm', 'username_match': SearchMatchType.prefix}, {'admin'}),
+        ({'username': 'min', 'username_match': SearchMatchType.suffix}, {'admin', 'sadmin'}),
+        ({'username': 'dmi', 'username_match': SearchMatchType.contains}, {'admin', 'sadmin'}),
+        ({'username': 'a%', 'username_match': SearchMatchType.prefix}, set()),
+        ({'phone': '138', 'phone_match': SearchMatchType.prefix}, {'admin'}),
+        ({'phone': '5678', 'phone_match': SearchMatchType.suffix}, {'sadmin'}),
+        ({'phone': '0001', 'phone_match': SearchMatchType.contains}, {'admin'}),
+    ],
+)
+def test_search_modes_sqlite(tmp_path, kwargs, expected):
+    async def main():
+        engine, session = await _sqlite_session(tmp_path)
+        try:
+            async with session() as db:
+                stmt = await user_dao.get_list(**kwargs)
+                return {user.username for user in (await db.scalars(stmt)).all()}
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(main()) == expected
+
+
+def test_index_usage_sqlite(tmp_path):
+    async def main():
+        engine, session = await _sqlite_session(tmp_path)
+        try:
+            async with session() as db:
+                # SQLite 的 LIKE 默认不区分大小写而无法使用索引，开启后验证查询形式可以使用索引
+                await db.execute(text('PRAGMA case_sensitive_like = ON'))
+                return [
+                    (expected, await used_indexes(db, (await user_dao.get_list(**kwargs)).order_by(None)))
+                    for kwargs, expected, mysql_only in INDEX_CHECKS
+                    if not mysql_only
+                ]
+        finally:
+            await engine.dispose()
+
+    for expected, indexes in asyncio.run(main()):
+        assert expected in indexes
+
+
+def test_contains_compiles_to_fulltext_on_mysql():
+    stmt = asyncio.run(user_dao.get_list(username='dmi', username_match=SearchMatchType.contains))
+    sql = str(stmt.compile(dialect=mysql.dialect()))
+    assert 'MATCH (sys_user.username) AGAINST' in sql
+    # 短于 ngram 分词长度的关键词回退为 LIKE
+    stmt = asyncio.run(user_dao.get_list(username='d', username_match=SearchMatchType.contains))
+    assert 'LIKE' in str(stmt.compile(dialect=mysql.dialect()))
+
+
+def test_index_usage_mysql():
+    async def main():
+        engine, session = create_async_engine_and_session(SQLALCHEMY_DATABASE_URL)
+        try:
+            try:
+                async with engine.connect() as conn:
+                    has_table = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table('sys_user'))
+            except Exception as e:
+                pytest.skip(f'MySQL 不可用：{e}')
+            if not has_table:
+                pytest.skip('MySQL 中不存在 sys_user 表')
+            async with session() as db:
+                return [
+                    (expected, await used_indexes(db, (await user_dao.get_list(**kwargs)).order_by(None)))
+                    for kwargs, expected, _ in INDEX_CHECKS
+                ]
+        finally:
+            await engine.dispose()
+
+    for expected, indexes in asyncio.run(main()):
+        assert expected in indexes
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import time
+
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+KT = TypeVar('KT', bound=Hashable)
+VT = TypeVar('VT')
+
+
+class LocalCache(Generic[KT, VT]):
+    """
+    进程内 TTL + LRU 缓存
+
+    仅适用于单个事件循环内使用，不保证线程安全；多进程之间数据不共享，过期时间即为进程间数据不一致的最大窗口
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        初始化缓存
+
+        :param maxsize: 最大条目数，超出后淘汰最久未使用的条目
+        :param ttl: 默认过期时间，单位：秒
+        :return:
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[KT, tuple[float, VT]] = OrderedDict()
+
+    def get(self, key: KT) -> VT | None:
+        """
+        获取缓存
+
+        :param key:
+        :return:
+        """
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expire_at, value = item
+        if expire_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: KT, value: VT, ttl: float | None = None) -> None:
+        """
+        设置缓存
+
+        :param key:
+        :param value:
+        :param ttl: 过期时间，单位：秒，默认使用初始化时的过期时间
+        :return:
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: KT) -> None:
+        """
+        删除缓存
+
+        :param key:
+        :return:
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,11 +1,25 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import asyncio
+import time
+
+from collections import deque
 from math import ceil
+from typing import Any, Awaitable, Callable
+
+import msgspec
 
-from fastapi import FastAPI, Request, Response
+from fastapi import APIRouter, FastAPI, Request, Response
 from fastapi.routing import APIRoute
+from sqlalchemy import text
 
 from backend.common.exception import errors
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.core.lifecycle import lifecycle
+from backend.database.db import async_engine
+from backend.database.pool import percentile
+from backend.database.redis import redis_client
 
 
 def ensure_unique_route_names(app: FastAPI) -> None:
@@ -34,3 +48,129 @@ async def http_limit_callback(request: Request, response: Response, expire: int)
     """
     expires = ceil(expire / 1000)
     raise errors.HTTPError(code=429, msg='请求过于频繁，请稍后重试', headers={'Retry-After': str(expires)})
+
+
+async def _probe_db() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+
+
+async def _probe_redis() -> None:
+    await redis_client.ping()
+
+
+class HealthProber:
+    """
+    依赖健康探测
+
+    后台任务按间隔探测数据库和 redis，并预先编码就绪检查的响应体；健康检查接口只返回缓存的结果，
+    不随负载均衡的轮询次数增加对数据库和 redis 的访问。就绪检查的响应体不包含错误详情，详情见 metrics()
+    """
+
+    live_body: bytes = msgspec.json.encode({'status': 'live'})
+    starting_body: bytes = msgspec.json.encode({'status': 'starting'})
+    draining_body: bytes = msgspec.json.encode({'status': 'draining'})
+
+    def __init__(self, probes: dict[str, Callable[[], Awaitable[None]]], *, interval: float, timeout: float) -> None:
+        """
+        初始化健康探测
+
+        :param probes: 依赖名称和探测函数
+        :param interval: 探测间隔，单位：秒
+        :param timeout: 单次探测超时时间，单位：秒
+        :return:
+        """
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.results: dict[str, dict[str, Any]] = {}
+        self.latencies: dict[str, deque[float]] = {name: deque(maxlen=300) for name in probes}
+        self.healthy = False
+        self.ready_body: bytes = msgspec.json.encode({'status': 'unavailable'})
+        self._task: asyncio.Task | None = None
+
+    async def _check(self, name: str, probe: Callable[[], Awaitable[None]]) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+        except Exception as e:
+            error_type = e.__class__.__name__
+            error = str(e) or error_type
+            if error != self.results.get(name, {}).get('error'):
+                log.warning('依赖 {} 探测失败: {}', name, error)
+        else:
+            error_type = error = None
+        latency = time.perf_counter() - start
+        self.latencies[name].append(latency)
+        return {'ok': error is None, 'latency_ms': round(latency * 1000, 3), 'error_type': error_type, 'error': error}
+
+    async def probe(self) -> None:
+        """探测所有依赖并更新缓存的结果"""
+        results = await asyncio.gather(*(self._check(name, probe) for name, probe in self.probes.items()))
+        healthy = all(result['ok'] for result in results)
+        if healthy != self.healthy:
+            log.info('依赖健康状态变更为 {}', 'healthy' if healthy else 'unhealthy')
+        self.results = dict(zip(self.probes, results))
+        self.healthy = healthy
+        # 就绪检查无需鉴权，只公开异常类型，完整的错误信息通过日志和监控接口查看
+        checks = {
+            name: {'ok': result['ok'], 'latency_ms': result['latency_ms'], 'error': result['error_type']}
+            for name, result in self.results.items()
+        }
+        self.ready_body = msgspec.json.encode({'status': 'ready' if healthy else 'unavailable', 'checks': checks})
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.probe()
+
+    async def start(self) -> None:
+        """完成首次探测并启动后台探测任务"""
+        if self._task is None:
+            await self.probe()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台探测任务"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def metrics(self) -> dict[str, Any]:
+        """探测结果及耗时指标"""
+        return {
+            'healthy': self.healthy,
+            'checks': {
+                name: {
+                    **self.results.get(name, {}),
+                    'p50_ms': round(percentile(list(latencies), 0.5) * 1000, 3),
+                    'p99_ms': round(percentile(list(latencies), 0.99) * 1000, 3),
+                    'max_ms': round(max(latencies, default=0) * 1000, 3),
+                }
+                for name, latencies in self.latencies.items()
+            },
+        }
+
+
+health_prober: HealthProber = HealthProber(
+    {'db': _probe_db, 'redis': _probe_redis},
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+)
+
+health_router = APIRouter(prefix='/health', tags=['健康检查'])
+
+
+@health_router.get('/live', summary='存活检查')
+async def health_live() -> Response:
+    return Response(content=HealthProber.live_body, media_type='application/json')
+
+
+@health_router.get('/ready', summary='就绪检查')
+async def health_ready() -> Response:
+    if not lifecycle.ready:
+        body = HealthProber.draining_body if lifecycle.draining else HealthProber.starting_body
+        return Response(content=body, status_code=503, media_type='application/json')
+    status_code = 200 if health_prober.healthy else 503
+    return Response(content=health_prober.ready_body, status_code=status_code, media_type='application/json')
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import math
+import time
+
+from collections import defaultdict
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.security.utils import get_authorization_scheme_param
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import redis_client
+from backend.utils.cache import LocalCache
+from backend.utils.health_check import http_limit_callback
+
+
+class RateLimiter:
+    """
+    请求限流器
+
+    每个进程使用 GCRA 算法在本地判定，命中次数按时间窗口累计后批量同步到 redis；当 redis 中的全局计数达到上限时，
+    该键在当前窗口内被本地拒绝。热路径仅访问内存，全局超限的最大偏差为 进程数 * 同步间隔内的请求数
+    """
+
+    def __init__(self) -> None:
+        self.rules: dict[str, tuple[int, int]] = settings.RATE_LIMIT_RULES
+        self._tat: LocalCache[tuple[str, str], float] = LocalCache(
+            maxsize=settings.RATE_LIMIT_LOCAL_MAXSIZE, ttl=max((s for _, s in self.rules.values()), default=1)
+        )
+        self._blocked: LocalCache[tuple[str, str], float] = LocalCache(
+            maxsize=settings.RATE_LIMIT_LOCAL_MAXSIZE, ttl=max((s for _, s in self.rules.values()), default=1)
+        )
+        self._pending: defaultdict[tuple[str, str, int], int] = defaultdict(int)
+        self._task: asyncio.Task | None = None
+        self._allowed = 0
+        self._rejected = 0
+        self._synced_keys = 0
+
+    @staticmethod
+    def get_identifier(request: Request) -> str:
+        """
+        获取限流标识，已登录用户使用 token sub，否则使用客户端 IP
+
+        :param request:
+        :return:
+        """
+        scheme, token = get_authorization_scheme_param(request.headers.get('Authorization'))
+        if token and scheme.lower() == 'bearer':
+            from backend.common.security.jwt import jwt_codec
+            from backend.common.security.jwt_codec import InvalidTokenError
+
+            try:
+                return f'user:{jwt_codec.decode(token)["sub"]}'
+            except (InvalidTokenError, KeyError):
+                pass
+        forwarded = request.headers.get('X-Forwarded-For')
+        if forwarded:
+            return f'ip:{forwarded.split(",")[0].strip()}'
+        return f'ip:{request.client.host if request.client else "unknown"}'
+
+    def hit(self, rule: str, identifier: str) -> float:
+        """
+        本地判定一次请求
+
+        :param rule: 规则名称
+        :param identifier: 限流标识
+        :return: 需要等待的秒数，0 表示放行
+        """
+        times, seconds = self.rules[rule]
+        now = time.time()
+        key = (rule, identifier)
+
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None and blocked_until > now:
+            return blocked_until - now
+
+        emission_interval = seconds / times
+        tat = max(self._tat.get(key) or now, now)
+        new_tat = tat + emission_interval
+        allow_at = new_tat - seconds
+        if allow_at > now:
+            return allow_at - now
+        self._tat.set(key, new_tat, ttl=seconds)
+        self._pending[(rule, identifier, math.floor(now / seconds))] += 1
+        return 0
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        route = request.scope.get('route')
+        if route is None:
+            return
+        rule = f'{request.method} {route.path}'
+        if rule not in self.rules:
+            return
+        retry_after = self.hit(rule, self.get_identifier(request))
+        if retry_after > 0:
+            self._rejected += 1
+            await http_limit_callback(request, response, math.ceil(retry_after * 1000))
+        self._allowed += 1
+
+    async def sync(self) -> None:
+        """将本地计数批量同步到 redis，并根据全局计数更新本地拒绝状态"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(int)
+        keys = list(pending.items())
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for (rule, identifier, window), count in keys:
+                redis_key = f'{settings.REQUEST_LIMITER_REDIS_PREFIX}:{rule}:{identifier}:{window}'
+                pipe.incrby(redis_key, count)
+                pipe.expire(redis_key, self.rules[rule][1] * 2)
+            results = await pipe.execute()
+        self._synced_keys += len(keys)
+        for index, ((rule, identifier, window), _) in enumerate(keys):
+            times, seconds = self.rules[rule]
+            if results[index * 2] >= times:
+                self._blocked.set((rule, identifier), (window + 1) * seconds, ttl=seconds)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.RATE_LIMIT_SYNC_SECONDS)
+            try:
+                await self.sync()
+            except Exception as e:
+                log.error('❌ 限流计数同步失败 {}', e)
+
+    def start(self) -> None:
+        """启动后台同步任务"""
+        if self._task is None and self.rules:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台同步任务"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def metrics(self) -> dict[str, Any]:
+        """限流指标"""
+        return {
+            'rules': {rule: {'times': times, 'seconds': seconds} for rule, (times, seconds) in self.rules.items()},
+            'tracked_keys': len(self._tat),
+            'blocked_keys': len(self._blocked),
+            'pending_keys': len(self._pending),
+            'allowed': self._allowed,
+            'rejected': self._rejected,
+            'synced_keys': self._synced_keys,
+        }
+
+
+rate_limiter: RateLimiter = RateLimiter()
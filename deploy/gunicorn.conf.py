@@ -1,19 +1,29 @@
 # fmt: off
+import gc
+import multiprocessing
+
 # 监听内网端口
 bind = '0.0.0.0:8001'
 
 # 工作目录
 chdir = '/fsm/backend/'
 
-# 并行工作进程数
-workers = 1
+# 并行工作进程数，验证码与 token 状态均存储于 redis，可按 CPU 核数扩展
+workers = multiprocessing.cpu_count()
 
 # 监听队列
 backlog = 512
 
+# 主进程预加载应用，工作进程通过 fork 共享已导入代码的内存页；
+# 数据库引擎和 redis 客户端在工作进程首次使用时创建，见 backend/core/registry.py
+preload_app = True
+
 # 超时时间
 timeout = 120
 
+# 优雅关闭时间，需大于 SHUTDOWN_DRAIN_SECONDS 与最长请求耗时之和，超时后工作进程被强制结束
+graceful_timeout = 60
+
 # 设置守护进程,将进程交给 supervisor 管理；如果设置为 True 时，supervisor 启动日志为：
 # gave up: fastapi_server entered FATAL state, too many start retries too quickly
 # 则需要将此改为: False
@@ -41,4 +51,17 @@ loglevel = 'debug'
 # python程序
 pythonpath = '/usr/local/lib/python3.10/site-packages'
 
+
+def when_ready(server):
+    # 冻结预加载产生的对象，避免工作进程垃圾回收时写入对象头导致共享内存页被复制
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from backend.core.registry import registry
+
+    # 丢弃继承自主进程的资源实例，工作进程首次使用时重新创建
+    registry.reset()
+
+
 # 启动 gunicorn -c gunicorn.conf.py main:app